@@ -41,6 +41,35 @@ class CoreAIController:
             self.performance_tracker.record_failure(agent_id, time.time() - start)
             raise e
 
+    def execute_tasks(self, agent_id: str, tasks: List[Task]) -> List[Dict[str, Any]]:
+        """تنفيذ دفعة مهام لنفس الـ Agent في استدعاء واحد"""
+        agent = self.agents.get(agent_id)
+        if not agent:
+            raise ValueError(f"Agent غير موجود: {agent_id}")
+        agent.status = "RUNNING"
+        start = time.time()
+        try:
+            # محاكاة عمل: الدفعة تُعالج معاً
+            time.sleep(min(0.3, max((t.estimated_duration or 0.3) for t in tasks)))
+            results = [{'agent_id': agent_id, 'task_id': t.id, 'status': 'SUCCESS', 'timestamp': time.time()}
+                       for t in tasks]
+            agent.tasks_completed += len(tasks)
+            agent.success_count += len(tasks)
+            agent.status = "IDLE"
+            agent.last_activity = time.time()
+            duration = time.time() - start
+            for _ in tasks:
+                self.performance_tracker.record_success(agent_id, duration)
+            return results
+        except Exception as e:
+            agent.failure_count += len(tasks)
+            agent.status = "IDLE"
+            agent.last_activity = time.time()
+            duration = time.time() - start
+            for _ in tasks:
+                self.performance_tracker.record_failure(agent_id, duration)
+            raise e
+
     def agent_health(self) -> Dict[str, Any]:
         out = {}
         for k, v in self.agents.items():
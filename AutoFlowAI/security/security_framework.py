@@ -2,29 +2,103 @@
 إطار الأمان المتقدم
 """
 import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from collections import defaultdict, deque
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
+from dataclasses import dataclass
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick اختياري
+    ahocorasick = None
 
 logger = logging.getLogger("SecurityFramework")
 
+SUSPICIOUS_KEYWORDS = ('script', 'DROP', 'SELECT', 'sudo', 'rm -rf', '<script>')
+# سقف أحداث السلوك المحفوظة لكل مستخدم بين عمليات التنظيف الزمني
+MAX_EVENTS_PER_USER = 4096
+
+# ميزات الطلب الفارغ (بدون حمولة ولا user-agent) محسوبة مسبقاً
+_EMPTY_FEATURES: Mapping[str, Any] = MappingProxyType({
+    'param_count': 0,
+    'payload_size': len(str({})),
+    'user_agent_len': 0,
+    'suspicious_keywords_count': 0,
+    'has_suspicious': False
+})
+
 class SecurityError(Exception):
     pass
 
 class SecurityViolation(SecurityError):
     pass
 
+@dataclass
+class _ReqView:
+    """قراءة واحدة لحقول الطلب تتشاركها جميع الطبقات"""
+    user_id: str
+    source_ip: Optional[str]
+    path: Optional[str]
+    payload: Any
+    payload_str: str
+    payload_lower: str
+    ua: str
+    param_count: int
+    roles: List[str]
+    required_roles: List[str]
+    data_classification: str
+
+    @classmethod
+    def from_request(cls, request: Dict[str, Any]) -> "_ReqView":
+        payload = request.get('payload') or {}
+        payload_str = str(payload)
+        return cls(
+            user_id=request.get('user_id', 'anonymous'),
+            source_ip=request.get('source_ip'),
+            path=request.get('path'),
+            payload=payload,
+            payload_str=payload_str,
+            payload_lower=payload_str.lower(),
+            ua=str(request.get('user_agent', '')),
+            param_count=len(payload),
+            roles=request.get('roles', []),
+            required_roles=request.get('required_roles', []),
+            data_classification=request.get('data_classification', 'public'),
+        )
+
+class KeywordMatcher:
+    """يعد الكلمات المشبوهة المختلفة في نص مُصغّر بمسح واحد عند توفر pyahocorasick"""
+    def __init__(self, keywords=SUSPICIOUS_KEYWORDS):
+        self.keywords = tuple(dict.fromkeys(k.lower() for k in keywords))
+        self.min_length = min(map(len, self.keywords), default=0)
+        self._automaton = None
+        if ahocorasick is not None and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for k in self.keywords:
+                automaton.add_word(k, k)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def count(self, text_lower: str) -> int:
+        if self._automaton is not None:
+            return len({k for _, k in self._automaton.iter(text_lower)})
+        return sum(1 for k in self.keywords if k in text_lower)
+
 class RateLimiter:
     def __init__(self, default_limit: int, window_sec: int):
         self.default_limit = default_limit
         self.window_sec = window_sec
-        self.events = defaultdict(deque)
+        self.events: Dict[str, deque] = {}
 
     def allow(self, key: str, limit: Optional[int] = None, window_sec: Optional[int] = None) -> bool:
         limit = limit or self.default_limit
         window_sec = window_sec or self.window_sec
         now = time.time()
-        dq = self.events[key]
+        dq = self.events.get(key)
+        if dq is None:
+            dq = self.events[key] = deque()
         # إزالة القديمة
         while dq and dq[0] < now - window_sec:
             dq.popleft()
@@ -33,6 +107,36 @@ class RateLimiter:
         dq.append(now)
         return True
 
+class AsyncRateLimiter:
+    """محدد معدل غير متزامن: ينتظر حتى تتوفر فتحة دون حجب حلقة الأحداث"""
+    def __init__(self, default_limit: int, window_sec: int):
+        self.default_limit = default_limit
+        self.window_sec = window_sec
+        self.events: Dict[str, deque] = {}
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, key: str, limit: Optional[int] = None, window_sec: Optional[int] = None) -> None:
+        limit = limit or self.default_limit
+        window_sec = window_sec or self.window_sec
+        async with self._cond:
+            while True:
+                now = time.time()
+                dq = self.events.get(key)
+                if dq is None:
+                    dq = self.events[key] = deque()
+                while dq and dq[0] < now - window_sec:
+                    dq.popleft()
+                if len(dq) < limit:
+                    # أخذ فتحة لا يحرر سعة، فلا داعي لإيقاظ المنتظرين؛ مهلة wait_for تعيدهم عند انتهاء النافذة
+                    dq.append(now)
+                    return
+                # الانتظار حتى يخرج أقدم حدث من النافذة ثم إعادة الفحص
+                delay = max(0.0, dq[0] + window_sec - now)
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
 class ThreatIntelligenceEngine:
     def predict_threat(self, features: Dict[str, Any]) -> Dict[str, Any]:
         score = 0.0
@@ -46,17 +150,24 @@ class ThreatIntelligenceEngine:
 
 class BehavioralAnalytics:
     def __init__(self):
-        self.history = defaultdict(deque)
+        self.history: Dict[str, deque] = {}
 
     def get_recent_requests(self, user_id: str, minutes: int = 1) -> list[Dict[str, Any]]:
+        dq = self.history.get(user_id)
+        if dq is None:
+            return []
         cutoff = time.time() - minutes * 60
-        dq = self.history[user_id]
         return [x for x in dq if x['time'] >= cutoff]
 
     def analyze_behavior(self, user_id: str, request: Dict[str, Any]) -> float:
+        return self.score_event(user_id, request.get('path'), len(str(request.get('payload', {}))))
+
+    def score_event(self, user_id: str, path: Optional[str], size: int) -> float:
         now = time.time()
-        dq = self.history[user_id]
-        dq.append({'time': now, 'path': request.get('path'), 'size': len(str(request.get('payload', {})))})
+        dq = self.history.get(user_id)
+        if dq is None:
+            dq = self.history[user_id] = deque(maxlen=MAX_EVENTS_PER_USER)
+        dq.append({'time': now, 'path': path, 'size': size})
         # إزالة القديمة (> 30 دقيقة)
         while dq and dq[0]['time'] < now - 1800:
             dq.popleft()
@@ -72,16 +183,18 @@ class BehavioralAnalytics:
         return max(min(base_score, 1.0), 0.0)
 
 class AdvancedSecurityFramework:
-    def __init__(self, security_level='maximum'):
+    def __init__(self, security_level='maximum', suspicious_keywords=SUSPICIOUS_KEYWORDS):
         self.security_level = security_level
+        self.keyword_matcher = KeywordMatcher(suspicious_keywords)
         self.threat_intelligence = ThreatIntelligenceEngine()
         self.behavioral_analytics = BehavioralAnalytics()
         self.rate_limiter = RateLimiter(default_limit=100, window_sec=60)
 
     def multi_layer_security_check(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        view = _ReqView.from_request(request)
+
         # طبقة 0: Rate Limiting
-        user_id = request.get('user_id', 'anonymous')
-        if not self.rate_limiter.allow(user_id):
+        if not self.rate_limiter.allow(view.user_id):
             raise SecurityViolation("تم تجاوز حد الطلبات المسموح.")
 
         layers = [
@@ -95,7 +208,7 @@ class AdvancedSecurityFramework:
         results = {}
         for i, layer in enumerate(layers, 1):
             try:
-                result = layer(request)
+                result = layer(view)
                 results[f'layer_{i}'] = {'status': 'passed', 'details': result}
             except SecurityViolation as e:
                 results[f'layer_{i}'] = {'status': 'failed', 'error': str(e), 'timestamp': time.time()}
@@ -104,44 +217,45 @@ class AdvancedSecurityFramework:
         logger.info("اجتاز الطلب جميع طبقات الأمان.")
         return results
 
-    def _layer_network_security(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        return {'source_ip': request.get('source_ip'), 'validated': True}
+    def _layer_network_security(self, view: _ReqView) -> Dict[str, Any]:
+        return {'source_ip': view.source_ip, 'validated': True}
 
-    def _layer_behavioral_analysis(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        uid = request.get('user_id', 'anonymous')
-        score = self.behavioral_analytics.analyze_behavior(uid, request)
+    def _layer_behavioral_analysis(self, view: _ReqView) -> Dict[str, Any]:
+        score = self.behavioral_analytics.score_event(view.user_id, view.path, len(view.payload_str))
         if score < 0.7:
             raise SecurityViolation(f"Suspicious behavior detected: score {score}")
         return {'behavior_score': score}
 
-    def _layer_ml_threat_detection(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        features = self._extract_request_features(request)
+    def _layer_ml_threat_detection(self, view: _ReqView) -> Dict[str, Any]:
+        features = self._extract_request_features(view)
         threat = self.threat_intelligence.predict_threat(features)
         if threat['threat_probability'] > 0.8:
             raise SecurityViolation(f"High threat probability: {threat['threat_probability']}")
         return threat
 
-    def _layer_data_classification(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        sens = request.get('data_classification', 'public')
+    def _layer_data_classification(self, view: _ReqView) -> Dict[str, Any]:
+        sens = view.data_classification
         return {'data_classification': sens, 'approved': sens in ['public', 'internal', 'confidential']}
 
-    def _layer_access_control(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        roles = request.get('roles', [])
-        required = request.get('required_roles', [])
+    def _layer_access_control(self, view: _ReqView) -> Dict[str, Any]:
+        roles = view.roles
+        required = view.required_roles
         if required and not any(r in roles for r in required):
             raise SecurityViolation("Access denied: insufficient role")
         return {'roles': roles}
 
-    def _extract_request_features(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        payload = request.get('payload') or {}
-        keywords = ['script', 'DROP', 'SELECT', 'sudo', 'rm -rf', '<script>']
-        ua = str(request.get('user_agent', ''))
-        has_suspicious = any(k.lower() in str(payload).lower() for k in keywords) or any(k.lower() in ua.lower() for k in keywords)
+    def _extract_request_features(self, view: _ReqView) -> Mapping[str, Any]:
+        if not view.payload:
+            # مسار سريع: لا حمولة، و user-agent أقصر من أقصر كلمة مشبوهة
+            if not view.ua:
+                return _EMPTY_FEATURES
+            if len(view.ua) < self.keyword_matcher.min_length:
+                return {**_EMPTY_FEATURES, 'user_agent_len': len(view.ua)}
+        count = self.keyword_matcher.count(view.payload_lower) + self.keyword_matcher.count(view.ua.lower())
         return {
-            'param_count': len(payload),
-            'payload_size': len(str(payload)),
-            'user_agent_len': len(ua),
-            'suspicious_keywords_count': sum(1 for k in keywords if k.lower() in str(payload).lower()) +
-            sum(1 for k in keywords if k.lower() in ua.lower()),
-            'has_suspicious': has_suspicious
+            'param_count': view.param_count,
+            'payload_size': len(view.payload_str),
+            'user_agent_len': len(view.ua),
+            'suspicious_keywords_count': count,
+            'has_suspicious': count > 0
         }
@@ -0,0 +1,43 @@
+"""
+اختبارات الأدوات المساعدة
+"""
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.config import Config
+from utils.helpers import is_debug_mode, refresh_debug_mode
+
+def test_debug_mode_cached_until_refresh(monkeypatch):
+    """اختبار أن DEBUG يُقرأ مرة واحدة ولا يتغير إلا عند إعادة القراءة"""
+    monkeypatch.setenv("DEBUG", "false")
+    assert refresh_debug_mode() is False
+
+    # تغيير البيئة وحده لا يؤثر على القيمة المخزنة
+    monkeypatch.setenv("DEBUG", "yes")
+    assert is_debug_mode() is False
+
+    assert refresh_debug_mode() is True
+    assert is_debug_mode() is True
+
+    monkeypatch.delenv("DEBUG")
+    assert refresh_debug_mode() is False
+
+def test_config_debug_matches_helpers(monkeypatch):
+    """اختبار أن Config يفسر DEBUG كما يفسره is_debug_mode ويتبع refresh_debug_mode"""
+    monkeypatch.setenv("DEBUG", "1")
+    monkeypatch.setenv("ENVIRONMENT", "staging")
+    refresh_debug_mode()
+    config = Config()
+    assert config.debug is True and config.debug == is_debug_mode()
+    assert config.environment == "staging"
+
+    monkeypatch.setenv("DEBUG", "false")
+    monkeypatch.delenv("ENVIRONMENT")
+    refresh_debug_mode()
+    config = Config()
+    assert config.debug is False
+    assert config.environment == "development"
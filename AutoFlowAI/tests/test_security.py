@@ -2,15 +2,17 @@
 اختبارات الأمان
 """
 import pytest
+import time
 import sys
 import os
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from security.security_framework import AdvancedSecurityFramework, RateLimiter
+from security.security_framework import AdvancedSecurityFramework, RateLimiter, AsyncRateLimiter
 from security.compliance import ComplianceManager
-from security.security_framework import BehavioralAnalytics, ThreatIntelligenceEngine
+from security.security_framework import BehavioralAnalytics, ThreatIntelligenceEngine, KeywordMatcher
+from security import security_framework
 
 def test_rate_limiter():
     """اختبار محدد المعدل"""
@@ -24,6 +26,34 @@ def test_rate_limiter():
     # الطلب الرابع يجب أن يُرفض
     assert limiter.allow("user1") == False
 
+@pytest.mark.asyncio
+async def test_async_rate_limiter():
+    """اختبار محدد المعدل غير المتزامن"""
+    limiter = AsyncRateLimiter(default_limit=2, window_sec=0.2)
+
+    start = time.time()
+    await limiter.acquire("user1")
+    await limiter.acquire("user1")
+    assert time.time() - start < 0.1
+
+    # الطلب الثالث ينتظر حتى تتحرر فتحة بدلاً من الرفض
+    await limiter.acquire("user1")
+    assert time.time() - start >= 0.15
+
+def test_keyword_matcher_counts_distinct_keywords():
+    """اختبار عد الكلمات المشبوهة المختلفة مرة واحدة لكل كلمة"""
+    matcher = KeywordMatcher()
+    text = "select * from t; drop table t; select 1".lower()
+    assert matcher.count(text) == 2
+    assert matcher.count("hello world") == 0
+
+@pytest.mark.skipif(security_framework.ahocorasick is None, reason="pyahocorasick غير مثبت")
+def test_keyword_matcher_uses_automaton_for_default_keywords():
+    """اختبار أن قائمة الكلمات الافتراضية تستخدم أتمتة Aho-Corasick"""
+    matcher = KeywordMatcher()
+    assert matcher._automaton is not None
+    assert matcher.count("<script>sudo rm -rf /</script>") == 4
+
 def test_behavioral_analytics():
     """اختبار التحليل السلوكي"""
     analytics = BehavioralAnalytics()
@@ -71,6 +71,62 @@ def test_workflow_conditions():
 
     assert "end" in next_nodes
 
+def test_workflow_next_nodes_index():
+    """اختبار فهرس الروابط الخارجة"""
+    workflow = Workflow("test_index", "اختبار الفهرس")
+
+    workflow.add_flow(Flow("start", "a"))
+    workflow.add_flow(Flow("start", "b", "false"))
+    workflow.add_flow(Flow("other", "c"))
+
+    assert workflow.get_next_nodes("start") == ["a"]
+
+    # التعديل المباشر على القائمة يجب أن يُلتقط أيضاً
+    workflow.flows.append(Flow("start", "d", "true"))
+    assert workflow.get_next_nodes("start") == ["a", "d"]
+    assert workflow.get_next_nodes("missing") == []
+
+def test_condition_variable_name_collisions():
+    """اختبار أن المتغيرات تُقرأ بالاسم دون تداخل الأسماء المتشابهة أو مشاكل الاقتباس"""
+    engine = WorkflowEngine()
+    variables = {"a": 1, "abc": 10, "s": 'say "hi"'}
+
+    assert engine._evaluate_condition("abc > a", variables)
+    assert engine._evaluate_condition("abc * a == 10", variables)
+    assert engine._evaluate_condition("""s == 'say "hi"'""", variables)
+    assert not engine._evaluate_condition("missing > 0", variables)
+    engine.shutdown()
+
+@pytest.mark.asyncio
+async def test_data_processing_operations():
+    """اختبار جدول عمليات معالجة البيانات المُحلَّل مسبقاً"""
+    from workflow.workflow_models import WorkflowContext
+
+    workflow = Workflow("data_ops", "عمليات البيانات")
+    workflow.add_node(Node("copy", "نسخ", "data_processing", config={'operation': 'copy', 'input_key': 'x', 'output_key': 'y'}))
+    workflow.add_node(Node("calc", "حساب", "data_processing", config={'operation': 'calculate', 'formula': 'x * 2', 'output_key': 'z'}))
+    workflow.add_node(Node("other", "أخرى", "data_processing", config={'operation': 'sort'}))
+
+    engine = WorkflowEngine()
+    engine.register_workflow(workflow)
+    context = WorkflowContext("exec", workflow.id, variables={'x': 3})
+
+    assert await engine._handle_data_processing_node(workflow, workflow.nodes["copy"], context) == {'y': 3}
+    assert await engine._handle_data_processing_node(workflow, workflow.nodes["calc"], context) == {'z': 6}
+    assert 'note' in await engine._handle_data_processing_node(workflow, workflow.nodes["other"], context)
+
+    # استبدال الإعداد يُلتقط دون إعادة التسجيل
+    workflow.nodes["calc"].config = {'operation': 'calculate', 'formula': 'x + 1', 'output_key': 'z'}
+    assert await engine._handle_data_processing_node(workflow, workflow.nodes["calc"], context) == {'z': 4}
+    engine.shutdown()
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots تتطلب Python 3.10")
+def test_workflow_models_use_slots():
+    """اختبار عدم وجود __dict__ لكل كائن"""
+    assert not hasattr(Node("start", "البداية", "start"), "__dict__")
+    assert not hasattr(Flow("start", "end"), "__dict__")
+    assert not hasattr(Workflow("slots_test", "اختبار"), "__dict__")
+
 def test_workflow_serialization():
     """اختبار حفظ وتحميل workflow"""
     original_workflow = Workflow("serialization_test", "اختبار التسلسل")
@@ -107,6 +163,45 @@ def test_workflow_serialization():
         if os.path.exists(temp_file):
             os.unlink(temp_file)
 
+def test_workflow_serialization_tracks_mutations():
+    """اختبار أن التسلسل والفهرس يعكسان التعديلات المباشرة"""
+    workflow = Workflow("cache_test", "اختبار التخزين")
+    node = Node("start", "البداية", "start")
+    workflow.add_node(node)
+    workflow.add_flow(Flow("start", "a"))
+
+    assert '"config": {}' in workflow.to_json()
+
+    node.config["k"] = 1
+    node.name = "renamed"
+    workflow.variables["limit"] = 5
+    data = workflow.to_dict()
+    assert data["nodes"]["start"]["config"] == {"k": 1}
+    assert data["nodes"]["start"]["name"] == "renamed"
+    assert '"limit": 5' in workflow.to_json()
+
+    assert workflow.get_next_nodes("start") == ["a"]
+    workflow.flows[0] = Flow("start", "c")
+    assert workflow.get_next_nodes("start") == ["c"]
+
+def test_workflow_positions_array():
+    """اختبار مصفوفة المواقع المخزنة وبقاء المواقع كما هي في to_dict"""
+    workflow = Workflow("positions_test", "اختبار المواقع")
+    workflow.add_node(Node("start", "البداية", "start", position=(0, 0)))
+    workflow.add_node(Node("mid", "الوسط", "delay", position=(1.5, 2)))
+
+    positions = workflow.positions()
+    assert positions.shape == (2, 2)
+    assert workflow.positions() is positions
+
+    workflow.add_node(Node("end", "النهاية", "end", position=(3, 4)))
+    assert workflow.positions().shape == (3, 2)
+
+    nodes = workflow.to_dict()["nodes"]
+    assert nodes["start"]["position"] == (0, 0)
+    assert type(nodes["start"]["position"][0]) is int
+    assert nodes["mid"]["position"] == (1.5, 2)
+
 def test_visual_editor():
     """اختبار المحرر المرئي"""
     workflow = Workflow("editor_test", "اختبار المحرر")
@@ -135,7 +230,171 @@ def test_workflow_engine():
     execution_id = engine.execute_workflow(workflow.id, {})
 
     assert execution_id is not None
-    assert execution_id in engine.running_executions
+    # قد تنتهي العملية فوراً فتنتقل إلى العمليات المنتهية
+    assert engine.get_execution_status(execution_id) is not None
+
+def test_workflow_engine_parallel_branches():
+    """اختبار تنفيذ الفروع المستقلة بالتوازي"""
+    import time
+
+    workflow = Workflow("parallel_test", "اختبار التوازي")
+    workflow.add_node(Node("start", "البداية", "start"))
+    workflow.add_node(Node("end", "النهاية", "end"))
+    for branch in ("a", "b", "c"):
+        workflow.add_node(Node(branch, branch, "delay", config={'seconds': 0.2}))
+        workflow.add_flow(Flow("start", branch))
+        workflow.add_flow(Flow(branch, "end"))
+
+    engine = WorkflowEngine()
+    engine.register_workflow(workflow)
+
+    started = time.time()
+    execution_id = engine.execute_workflow(workflow.id, {})
+    while engine.get_execution_status(execution_id)['status'] == 'running':
+        time.sleep(0.01)
+
+    status = engine.get_execution_status(execution_id)
+    assert status['status'] == 'completed'
+    assert status['history_count'] == 5
+    # ثلاث عقد تأخير بـ 0.2 ثانية لكل منها تعمل معاً
+    assert time.time() - started < 0.5
+    engine.shutdown()
+
+def test_workflow_engine_batches_agent_tasks():
+    """اختبار تجميع مهام الـ Agent نفسه في دفعة واحدة"""
+    import time
+
+    class BatchCore:
+        def __init__(self):
+            self.batches = []
+
+        def execute_task(self, agent_id, task):
+            raise AssertionError("يجب استخدام execute_tasks")
+
+        def execute_tasks(self, agent_id, tasks):
+            self.batches.append(len(tasks))
+            self.contexts = [t.payload['workflow_context'] for t in tasks]
+            return [{'task_id': t.id} for t in tasks]
+
+    class System:
+        core = BatchCore()
+
+    workflow = Workflow("batch_test", "اختبار الدفعات")
+    workflow.add_node(Node("start", "البداية", "start"))
+    for branch in ("a", "b", "c"):
+        config = {'context_fields': ['workflow_id', 'missing']} if branch == "a" else {}
+        workflow.add_node(Node(branch, branch, "ai_agent", agent_id="agent", config=config))
+        workflow.add_flow(Flow("start", branch))
+
+    engine = WorkflowEngine(System())
+    engine.register_workflow(workflow)
+    execution_id = engine.execute_workflow(workflow.id, {})
+    while engine.get_execution_status(execution_id)['status'] == 'running':
+        time.sleep(0.01)
+
+    assert System.core.batches == [3]
+    # السياق يقتصر على معرّف التنفيذ ما لم تُطلب حقول أخرى
+    assert sorted(len(c) for c in System.core.contexts) == [1, 1, 2]
+    assert {'execution_id': execution_id, 'workflow_id': workflow.id} in System.core.contexts
+    results = engine.get_full_execution(execution_id)['results']
+    # كل عقدة تتلقى نتيجة مهمتها هي
+    assert len({results[b]['task_result']['task_id'] for b in ("a", "b", "c")}) == 3
+    engine.shutdown()
+
+def test_workflow_engine_batch_short_results():
+    """اختبار أن نقص نتائج الدفعة يُفشل المهام بدلاً من تعليقها"""
+    import time
+
+    class ShortCore:
+        def execute_tasks(self, agent_id, tasks):
+            return [{'task_id': tasks[0].id}]
+
+    class System:
+        core = ShortCore()
+
+    workflow = Workflow("short_batch_test", "اختبار نقص النتائج")
+    workflow.add_node(Node("start", "البداية", "start"))
+    for branch in ("a", "b"):
+        workflow.add_node(Node(branch, branch, "ai_agent", agent_id="agent"))
+        workflow.add_flow(Flow("start", branch))
+
+    engine = WorkflowEngine(System())
+    engine.register_workflow(workflow)
+    execution_id = engine.execute_workflow(workflow.id, {})
+    deadline = time.time() + 5
+    while engine.get_execution_status(execution_id)['status'] == 'running' and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert engine.get_execution_status(execution_id)['status'] == 'completed'
+    results = engine.get_full_execution(execution_id)['results']
+    assert all('error' in results[b] for b in ("a", "b"))
+    engine.shutdown()
+
+def test_node_history_ring_buffer():
+    """اختبار سجل العقد الحلقي ذي الأعمدة المتوازية"""
+    from workflow.workflow_models import NodeHistory
+
+    history = NodeHistory(capacity=3)
+    for i in range(5):
+        seq = history.start(f"n{i}", float(i))
+        history.finish(seq, NodeHistory.FAILED if i == 4 else NodeHistory.COMPLETED, 0.5,
+                       "boom" if i == 4 else None)
+
+    assert len(history) == 3
+    assert history.total == 5
+    records = history.to_dicts()
+    assert [r['node_id'] for r in records] == ["n2", "n3", "n4"]
+    assert records[-1]['status'] == "failed"
+    assert records[-1]['error'] == "boom"
+    assert records[0]['status'] == "completed"
+
+def test_workflow_engine_executions_index():
+    """اختبار فهرسة عمليات التنفيذ حسب الـ Workflow والملخص الخفيف"""
+    import time
+
+    workflow = Workflow("index_test", "اختبار الفهرس")
+    workflow.add_node(Node("start", "البداية", "start"))
+    workflow.add_node(Node("end", "النهاية", "end"))
+    workflow.add_flow(Flow("start", "end"))
+
+    engine = WorkflowEngine()
+    engine.register_workflow(workflow)
+    ids = [engine.execute_workflow(workflow.id, {'n': i}) for i in range(3)]
+    while any(engine.get_execution_status(i)['status'] == 'running' for i in ids):
+        time.sleep(0.01)
+
+    executions = engine.get_workflow_executions(workflow.id)
+    assert [e['execution_id'] for e in executions] == ids
+    assert 'variables' not in executions[0]
+    assert engine.get_workflow_executions("missing") == []
+
+    assert engine.running_executions == {}
+    assert set(engine.completed_executions) == set(ids)
+
+    full = engine.get_full_execution(ids[0])
+    assert full['variables']['n'] == 0
+    assert [h['node_id'] for h in full['history']] == ["start", "end"]
+    engine.shutdown()
+
+def test_workflow_engine_completed_retention():
+    """اختبار حذف أقدم العمليات المنتهية عند تجاوز الحد"""
+    import time
+
+    workflow = Workflow("retention_test", "اختبار الاحتفاظ")
+    workflow.add_node(Node("start", "البداية", "start"))
+
+    engine = WorkflowEngine(max_completed=2)
+    engine.register_workflow(workflow)
+    ids = []
+    for _ in range(4):
+        ids.append(engine.execute_workflow(workflow.id))
+        while ids[-1] in engine.running_executions:
+            time.sleep(0.01)
+
+    assert list(engine.completed_executions) == ids[2:]
+    assert engine.get_execution_status(ids[0]) is None
+    assert [e['execution_id'] for e in engine.get_workflow_executions(workflow.id)] == ids[2:]
+    engine.shutdown()
 
 if __name__ == "__main__":
     pytest.main([__file__])
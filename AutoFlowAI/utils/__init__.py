@@ -3,6 +3,6 @@
 """
 from .helpers import *
 from .logger import setup_logger
-from .config import Config
+from .config import Config, get_config
 
-__all__ = ["setup_logger", "Config"]
+__all__ = ["setup_logger", "Config", "get_config"]
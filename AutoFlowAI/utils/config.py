@@ -2,9 +2,12 @@
 إعدادات النظام
 """
 import os
-import json
+import functools
+from pathlib import Path
 from typing import Dict, Any, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
+
+from .helpers import get_environment, is_debug_mode, json_dumps_bytes, json_loads
 
 @dataclass
 class DatabaseConfig:
@@ -35,6 +38,7 @@ class WorkflowConfig:
     max_nodes_per_workflow: int = 100
     parallel_execution: bool = True
     save_state_enabled: bool = True
+    max_completed_executions: int = 1000
 
 @dataclass
 class TradingConfig:
@@ -44,13 +48,56 @@ class TradingConfig:
     take_profit_percentage: float = 0.1
     paper_trading: bool = True
 
+def _env_bool(value: str) -> bool:
+    return value.lower() == 'true'
+
+# (القسم، الحقل، متغير البيئة، المحوِّل)
+_ENV_FIELDS = (
+    # قاعدة البيانات
+    ('database', 'host', 'DB_HOST', str),
+    ('database', 'port', 'DB_PORT', int),
+    ('database', 'name', 'DB_NAME', str),
+    ('database', 'user', 'DB_USER', str),
+    ('database', 'password', 'DB_PASSWORD', str),
+    # الأمان
+    ('security', 'secret_key', 'SECRET_KEY', str),
+    ('security', 'jwt_expiration', 'JWT_EXPIRATION', int),
+    # الوكلاء
+    ('agent', 'max_concurrent_tasks', 'MAX_CONCURRENT_TASKS', int),
+    ('agent', 'task_timeout', 'TASK_TIMEOUT', int),
+    # العمليات
+    ('workflow', 'max_execution_time', 'WORKFLOW_TIMEOUT', int),
+    ('workflow', 'max_completed_executions', 'WORKFLOW_MAX_COMPLETED', int),
+    # التداول
+    ('trading', 'risk_tolerance', 'RISK_TOLERANCE', str),
+    ('trading', 'paper_trading', 'PAPER_TRADING', _env_bool),
+)
+
+@functools.lru_cache(maxsize=128)
+def _compile_path(key: str):
+    """بناء دالة تتبع مسار الخصائص المنقط مرة واحدة لكل مفتاح"""
+    parts = tuple(key.split('.'))
+
+    def resolve(root: Any) -> Any:
+        obj = root
+        for part in parts:
+            obj = getattr(obj, part)
+        return obj
+    return resolve
+
+@functools.lru_cache(maxsize=128)
+def _compile_parent_path(key: str):
+    parent, _, attr = key.rpartition('.')
+    return (_compile_path(parent) if parent else None), attr
+
 class Config:
     """إعدادات النظام الرئيسية"""
 
     def __init__(self, config_file: Optional[str] = None):
         self.config_file = config_file
-        self.debug = os.getenv('DEBUG', 'false').lower() == 'true'
-        self.environment = os.getenv('ENVIRONMENT', 'development')
+        # القيم المخزنة في helpers، فيتفق Config مع is_debug_mode في تفسير DEBUG
+        self.debug = is_debug_mode()
+        self.environment = get_environment()
 
         # إعدادات فرعية
         self.database = DatabaseConfig()
@@ -69,8 +116,7 @@ class Config:
     def load_from_file(self, config_file: str):
         """تحميل الإعدادات من ملف"""
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
+            config_data = json_loads(Path(config_file).read_bytes())
 
             # تحديث الإعدادات
             for section, values in config_data.items():
@@ -85,68 +131,42 @@ class Config:
 
     def load_from_env(self):
         """تحميل الإعدادات من متغيرات البيئة"""
-        # قاعدة البيانات
-        self.database.host = os.getenv('DB_HOST', self.database.host)
-        self.database.port = int(os.getenv('DB_PORT', self.database.port))
-        self.database.name = os.getenv('DB_NAME', self.database.name)
-        self.database.user = os.getenv('DB_USER', self.database.user)
-        self.database.password = os.getenv('DB_PASSWORD', self.database.password)
-
-        # الأمان
-        self.security.secret_key = os.getenv('SECRET_KEY', self.security.secret_key)
-        self.security.jwt_expiration = int(os.getenv('JWT_EXPIRATION', self.security.jwt_expiration))
-
-        # الوكلاء
-        self.agent.max_concurrent_tasks = int(os.getenv('MAX_CONCURRENT_TASKS', self.agent.max_concurrent_tasks))
-        self.agent.task_timeout = int(os.getenv('TASK_TIMEOUT', self.agent.task_timeout))
-
-        # العمليات
-        self.workflow.max_execution_time = int(os.getenv('WORKFLOW_TIMEOUT', self.workflow.max_execution_time))
-
-        # التداول
-        self.trading.risk_tolerance = os.getenv('RISK_TOLERANCE', self.trading.risk_tolerance)
-        self.trading.paper_trading = os.getenv('PAPER_TRADING', 'true').lower() == 'true'
+        env = os.environ
+        for section, key, env_key, cast in _ENV_FIELDS:
+            value = env.get(env_key)
+            if value is not None:
+                setattr(getattr(self, section), key, cast(value))
 
     def save_to_file(self, config_file: str):
         """حفظ الإعدادات في ملف"""
         config_data = {
             'debug': self.debug,
             'environment': self.environment,
-            'database': self.database.__dict__,
-            'security': self.security.__dict__,
-            'agent': self.agent.__dict__,
-            'workflow': self.workflow.__dict__,
-            'trading': self.trading.__dict__
+            'database': asdict(self.database),
+            'security': asdict(self.security),
+            'agent': asdict(self.agent),
+            'workflow': asdict(self.workflow),
+            'trading': asdict(self.trading)
         }
 
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, indent=2, ensure_ascii=False)
+        Path(config_file).write_bytes(json_dumps_bytes(config_data))
 
     def get(self, key: str, default: Any = None) -> Any:
         """الحصول على قيمة إعداد"""
-        keys = key.split('.')
-        obj = self
-
-        for k in keys:
-            if hasattr(obj, k):
-                obj = getattr(obj, k)
-            else:
-                return default
-
-        return obj
+        try:
+            return _compile_path(key)(self)
+        except AttributeError:
+            return default
 
     def set(self, key: str, value: Any):
         """تعيين قيمة إعداد"""
-        keys = key.split('.')
-        obj = self
-
-        for k in keys[:-1]:
-            if hasattr(obj, k):
-                obj = getattr(obj, k)
-            else:
-                raise ValueError(f"الطريق غير موجود: {key}")
+        resolve_parent, attr = _compile_parent_path(key)
+        try:
+            obj = resolve_parent(self) if resolve_parent else self
+        except AttributeError:
+            raise ValueError(f"الطريق غير موجود: {key}")
 
-        setattr(obj, keys[-1], value)
+        setattr(obj, attr, value)
 
     def is_production(self) -> bool:
         """فحص بيئة الإنتاج"""
@@ -163,5 +183,10 @@ class Config:
     def __repr__(self) -> str:
         return f"Config(environment={self.environment}, debug={self.debug})"
 
+@functools.lru_cache(maxsize=1)
+def get_config(config_file: Optional[str] = None) -> Config:
+    """الحصول على نسخة الإعدادات المشتركة في العملية"""
+    return Config(config_file)
+
 # إنشاء إعداد افتراضي
-config = Config()
+config = get_config()
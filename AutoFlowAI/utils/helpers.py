@@ -1,63 +1,105 @@
 """
 دوال مساعدة
 """
+import os
+import re
 import json
+import logging
 import uuid
 import hashlib
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from functools import wraps
 
+try:
+    import orjson
+except ImportError:  # orjson اختياري
+    orjson = None
+
+logger = logging.getLogger("Helpers")
+
+# مُرمِّزات مشتركة بدلاً من إنشاء JSONEncoder جديد في كل استدعاء json.dumps بخيارات غير افتراضية
+# نفس مخرجات json.dumps(data, sort_keys=True) كي لا تتغير قيم hash_data المحفوظة
+_encode_sorted = json.JSONEncoder(sort_keys=True).encode
+_encode_pretty = json.JSONEncoder(ensure_ascii=False, indent=2).encode
+_encode_compact = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+_DURATION_RE = re.compile(r'\s*([-+]?(?:\d+(?:\.\d*)?|\.\d+))\s*([hms]?)\s*$', re.IGNORECASE)
+_DURATION_UNITS = {'h': 3600, 'm': 60, 's': 1, '': 1}
+
+# تُقرأ DEBUG و ENVIRONMENT مرة واحدة لكل عملية؛ Config يقرأ القيم من هنا
+_DEBUG = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+_ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+
 def generate_id(prefix: str = "") -> str:
     """توليد معرف فريد"""
     unique_id = str(uuid.uuid4())[:8]
     return f"{prefix}_{unique_id}" if prefix else unique_id
 
+def _hash_bytes(data: Any) -> bytes:
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode()
+    return _encode_sorted(data).encode()
+
 def hash_data(data: Any) -> str:
     """تشفير البيانات"""
-    data_str = json.dumps(data, sort_keys=True) if not isinstance(data, str) else data
-    return hashlib.sha256(data_str.encode()).hexdigest()
+    return hashlib.sha256(_hash_bytes(data)).hexdigest()
+
+def hash_many(items: Iterable[Any], algorithm: str = 'sha256') -> List[str]:
+    """تشفير مجموعة عناصر دفعة واحدة (algorithm يقبل أي خوارزمية في hashlib مثل blake2b)"""
+    if algorithm == 'sha256':
+        return [hashlib.sha256(_hash_bytes(item)).hexdigest() for item in items]
+    return [hashlib.new(algorithm, _hash_bytes(item)).hexdigest() for item in items]
+
+def json_dumps_bytes(data: Any, compact: bool = False) -> bytes:
+    """تسلسل JSON إلى UTF-8، منسق افتراضياً (orjson إن توفر)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(data, option=option)
+    if compact:
+        return _encode_compact(data).encode('utf-8')
+    return _encode_pretty(data).encode('utf-8')
+
+def json_loads(data: Any) -> Any:
+    """تحليل JSON من نص أو بايتات (orjson إن توفر)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 def format_timestamp(timestamp: float) -> str:
     """تنسيق الطابع الزمني"""
-    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+    t = time.localtime(timestamp)
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
 
 def parse_duration(duration_str: str) -> float:
     """تحويل مدة نصية إلى ثواني"""
     if not duration_str:
         return 0.0
 
-    duration_str = duration_str.lower().strip()
-
-    if 'h' in duration_str:
-        hours = float(duration_str.replace('h', ''))
-        return hours * 3600
-    elif 'm' in duration_str:
-        minutes = float(duration_str.replace('m', ''))
-        return minutes * 60
-    elif 's' in duration_str:
-        return float(duration_str.replace('s', ''))
-    else:
-        # افتراض ثواني
-        try:
-            return float(duration_str)
-        except:
-            return 0.0
+    match = _DURATION_RE.match(duration_str)
+    if not match:
+        return 0.0
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
 
 def retry_on_exception(max_retries: int = 3, delay: float = 1.0):
     """مزخرف إعادة المحاولة"""
+    # جدول التأخير المتزايد يُحسب مرة واحدة عند التزيين
+    delays = tuple(delay * (2 ** attempt) for attempt in range(max_retries))
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            for attempt in range(max_retries + 1):
+            for attempt_delay in delays:
                 try:
                     return func(*args, **kwargs)
-                except Exception as e:
-                    if attempt == max_retries:
-                        raise e
-                    time.sleep(delay * (2 ** attempt)) # تأخير متزايد
-            return None
+                except Exception:
+                    time.sleep(attempt_delay)
+            # المحاولة الأخيرة تُطلق الاستثناء كما هو
+            return func(*args, **kwargs)
         return wrapper
     return decorator
 
@@ -65,17 +107,18 @@ def measure_time(func):
     """مزخرف قياس الوقت"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
-        print(f"⏱️ {func.__name__} استغرق {execution_time:.3f} ثانية")
+        execution_time = time.perf_counter() - start_time
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("⏱️ %s استغرق %.3f ثانية", func.__name__, execution_time)
         return result
     return wrapper
 
 def validate_json(data: str) -> bool:
     """التحقق من صحة JSON"""
     try:
+        # json.loads لا json_loads: orjson يرفض NaN و Infinity التي يقبلها المحلل القياسي
         json.loads(data)
         return True
     except json.JSONDecodeError:
@@ -88,20 +131,37 @@ def safe_get(data: Dict[str, Any], key: str, default: Any = None) -> Any:
     except (KeyError, TypeError):
         return default
 
+def chunk_iter(items: Iterable[Any], chunk_size: int) -> Iterator[Any]:
+    """توليد القطع واحدة تلو الأخرى دون بناء قائمة القطع كاملة"""
+    if isinstance(items, Sequence) or hasattr(items, 'shape'):
+        # تقطيع مباشر؛ مصفوفات NumPy تُرجع عروضاً بلا نسخ
+        for i in range(0, len(items), chunk_size):
+            yield items[i:i + chunk_size]
+        return
+    it = iter(items)
+    while chunk := list(islice(it, chunk_size)):
+        yield chunk
+
 def chunk_list(lst: List[Any], chunk_size: int) -> List[List[Any]]:
     """تقسيم قائمة إلى قطع"""
-    return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
+    return list(chunk_iter(lst, chunk_size))
 
 def flatten_dict(d: Dict[str, Any], parent_key: str = '', sep: str = '.') -> Dict[str, Any]:
     """تسطيح القاموس المتعدد المستويات"""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
+    out = {}
+    # مكدس من المُكرِّرات يحافظ على ترتيب المفاتيح دون استدعاءات عودية
+    stack = [(iter(d.items()), parent_key)]
+    while stack:
+        items, prefix = stack[-1]
+        for k, v in items:
+            new_key = f"{prefix}{sep}{k}" if prefix else k
+            if isinstance(v, dict):
+                stack.append((iter(v.items()), new_key))
+                break
+            out[new_key] = v
         else:
-            items.append((new_key, v))
-    return dict(items)
+            stack.pop()
+    return out
 
 def class_name(obj: Any) -> str:
     """الحصول على اسم الكلاس"""
@@ -109,5 +169,15 @@ def class_name(obj: Any) -> str:
 
 def is_debug_mode() -> bool:
     """فحص وضع التطوير"""
-    import os
-    return os.getenv('DEBUG', 'false').lower() in ['true', '1', 'yes']
+    return _DEBUG
+
+def get_environment() -> str:
+    """بيئة التشغيل (ENVIRONMENT) المقروءة عند التحميل"""
+    return _ENVIRONMENT
+
+def refresh_debug_mode() -> bool:
+    """إعادة قراءة DEBUG و ENVIRONMENT من البيئة (للاختبارات)"""
+    global _DEBUG, _ENVIRONMENT
+    _DEBUG = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+    _ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+    return _DEBUG
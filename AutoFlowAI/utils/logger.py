@@ -3,11 +3,30 @@
 """
 import logging
 import sys
+import time
 from typing import Dict, Any, Optional
 from datetime import datetime
 import json
 from logging.handlers import RotatingFileHandler
 
+class CachedTimeFormatter(logging.Formatter):
+    """منسق يعيد استخدام نص الوقت للسجلات الواقعة في الثانية نفسها"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._time_cache = (None, '')
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        # بدون datefmt يضيف التنسيق الافتراضي الميلي ثانية فلا يصح التخزين بالثانية
+        if not datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, cached_text = self._time_cache
+        if second != cached_second:
+            cached_text = super().formatTime(record, datefmt)
+            self._time_cache = (second, cached_text)
+        return cached_text
+
 def setup_logger(name: str = "AutoFlowAI", level: str = "INFO",
                  log_file: Optional[str] = None,
                  max_bytes: int = 10*1024*1024, backup_count: int = 5) -> logging.Logger:
@@ -22,7 +41,7 @@ def setup_logger(name: str = "AutoFlowAI", level: str = "INFO",
     logger.handlers.clear()
 
     # تنسيق الرسائل
-    formatter = logging.Formatter(
+    formatter = CachedTimeFormatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
@@ -60,13 +79,12 @@ def log_function_call(logger: logging.Logger):
 def log_performance(logger: logging.Logger):
     """مزخرف تسجيل الأداء"""
     def decorator(func):
-        import time
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             result = func(*args, **kwargs)
-            end_time = time.time()
-            duration = end_time - start_time
-            logger.info(f"{func.__name__} استغرق {duration:.3f} ثانية")
+            duration = time.perf_counter() - start_time
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("%s استغرق %.3f ثانية", func.__name__, duration)
             return result
         return wrapper
     return decorator
@@ -80,30 +98,28 @@ class PerformanceLogger:
 
     def start_timer(self, operation: str):
         """بدء مؤقت العملية"""
-        import time
-        self.metrics[operation] = {'start_time': time.time()}
+        self.metrics[operation] = {'start_time': time.perf_counter()}
 
     def end_timer(self, operation: str, metadata: Dict[str, Any] = None):
         """إنهاء مؤقت العملية"""
-        import time
-        if operation not in self.metrics:
+        timer = self.metrics.pop(operation, None)
+        if timer is None:
             self.logger.warning(f"لم يتم بدء مؤقت العملية: {operation}")
             return
 
-        start_time = self.metrics[operation]['start_time']
-        end_time = time.time()
-        duration = end_time - start_time
+        duration = time.perf_counter() - timer['start_time']
+
+        # لا داعي لبناء السجل إذا كان المستوى INFO معطلاً
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
 
         log_data = {
             'operation': operation,
             'duration': duration,
-            'timestamp': end_time
+            'timestamp': time.time()
         }
 
         if metadata:
             log_data.update(metadata)
 
-        self.logger.info(f"أداء العملية: {json.dumps(log_data, ensure_ascii=False)}")
-
-        # تنظيف
-        del self.metrics[operation]
+        self.logger.info("أداء العملية: %s", json.dumps(log_data, ensure_ascii=False))
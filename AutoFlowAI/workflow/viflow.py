@@ -1,16 +1,79 @@
 """
 ViFlow - محرك Workflow الأساسي
 """
+import ast
+import sys
 import uuid
 import time
+import functools
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
-import json
+import numpy as np
 
+from utils.helpers import json_dumps_bytes, json_loads
 from .workflow_models import WorkflowContext, NodeExecution, WorkflowStatus, NodeType
 
-@dataclass
+# slots=True متاح في dataclasses ابتداءً من Python 3.10
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+def _intern(value: Any) -> Any:
+    """توحيد نسخ معرفات العقد لتصبح المقارنة مقارنة مؤشرات"""
+    return sys.intern(value) if type(value) is str else value
+
+_CONSTANT_CONDITIONS = {'true': True, 'false': False}
+
+class _TrackedList(list):
+    """قائمة يزيد عداد مراجعتها مع كل تعديل، لاكتشاف التعديل المباشر على workflow.flows"""
+    revision = 0
+
+class _TrackedDict(dict):
+    """قاموس يزيد عداد مراجعته مع كل تعديل، لاكتشاف التعديل المباشر على workflow.nodes"""
+    revision = 0
+
+def _track_mutations(cls, names):
+    base = cls.__mro__[1]
+    for name in names:
+        def mutator(self, *args, _method=getattr(base, name), **kwargs):
+            self.revision += 1
+            return _method(self, *args, **kwargs)
+        mutator.__name__ = name
+        setattr(cls, name, mutator)
+
+_track_mutations(_TrackedList, ('append', 'extend', 'insert', 'pop', 'remove', 'clear', 'sort',
+                                'reverse', '__setitem__', '__delitem__', '__iadd__', '__imul__'))
+_track_mutations(_TrackedDict, ('__setitem__', '__delitem__', 'pop', 'popitem', 'clear',
+                                'update', 'setdefault', '__ior__'))
+
+# تعابير تربط أسماء محلية خاصة بها، فلا يصح تحويل أسمائها إلى قراءات من السياق
+_SCOPED_NODES = (ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp, ast.NamedExpr)
+
+class _ContextLoads(ast.NodeTransformer):
+    """تحويل قراءة كل اسم `x` إلى `_ctx['x']`"""
+    def visit_Name(self, node: ast.Name):
+        if not isinstance(node.ctx, ast.Load):
+            return node
+        return ast.copy_location(
+            ast.Subscript(value=ast.Name('_ctx', ast.Load()), slice=ast.Constant(node.id), ctx=ast.Load()),
+            node)
+
+@functools.lru_cache(maxsize=256)
+def _compile_condition(condition: str):
+    """ترجمة تعبير الشرط مرة واحدة إلى دالة تأخذ السياق؛ None إذا كان غير صالح"""
+    try:
+        tree = ast.parse(condition, mode='eval')
+    except SyntaxError:
+        return None
+    if any(isinstance(n, _SCOPED_NODES) for n in ast.walk(tree)):
+        code = compile(tree, '<flow-cond>', 'eval')
+        return lambda ctx: eval(code, {"__builtins__": {}}, ctx)
+    # دالة مخصصة للتعبير: قراءات مباشرة من السياق بدل بحث الأسماء في eval
+    wrapper = ast.parse('lambda _ctx: None', mode='eval')
+    wrapper.body.body = _ContextLoads().visit(tree).body
+    ast.fix_missing_locations(wrapper)
+    return eval(compile(wrapper, '<flow-cond>', 'eval'), {"__builtins__": {}})
+
+@dataclass(**_SLOTS)
 class Node:
     id: str
     name: str
@@ -22,13 +85,20 @@ class Node:
     inputs: List[str] = field(default_factory=list)
     outputs: List[str] = field(default_factory=list)
 
-@dataclass
+    def __post_init__(self):
+        self.id = _intern(self.id)
+
+@dataclass(**_SLOTS)
 class Flow:
     from_node: str
     to_node: str
     condition: Optional[str] = None # true/false أو شرط مخصص
 
-@dataclass
+    def __post_init__(self):
+        self.from_node = _intern(self.from_node)
+        self.to_node = _intern(self.to_node)
+
+@dataclass(**_SLOTS)
 class Workflow:
     id: str
     name: str
@@ -39,6 +109,16 @@ class Workflow:
     created_at: float = field(default_factory=time.time)
     version: str = "1.0.0"
     tags: List[str] = field(default_factory=list)
+    # الروابط الخارجة من كل عقدة، يُعاد بناؤها عند أي تعديل على self.flows
+    _adj: Dict[str, List[Flow]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _adj_key: Any = field(default=None, init=False, repr=False, compare=False)
+    # مواقع العقد كمصفوفة (N, 2) بترتيب self.nodes، يُعاد بناؤها عند تعديل العقد
+    _positions: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _positions_key: Any = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.nodes = _TrackedDict(self.nodes)
+        self.flows = _TrackedList(self.flows)
 
     def add_node(self, node: Node):
         self.nodes[node.id] = node
@@ -46,39 +126,70 @@ class Workflow:
     def add_flow(self, flow: Flow):
         self.flows.append(flow)
 
+    def invalidate_indexes(self):
+        """إبطال فهرس الروابط ومصفوفة المواقع (يلزم فقط بعد تغيير from_node/to_node لرابط أو position لعقدة موجودة)"""
+        self._adj_key = None
+        self._positions_key = None
+
+    def structure_revision(self) -> Tuple:
+        """مفتاح يتغير مع أي تعديل على العقد أو الروابط؛ القوائم المستبدلة بقوائم عادية لا تُخزَّن"""
+        nodes, flows = self.nodes, self.flows
+        if type(nodes) is not _TrackedDict or type(flows) is not _TrackedList:
+            return (object(),)
+        return (id(nodes), nodes.revision, id(flows), flows.revision)
+
+    def adjacency(self) -> Dict[str, List[Flow]]:
+        """الروابط الخارجة لكل عقدة، تُعاد بناؤها فقط بعد تعديل الروابط"""
+        key = self.structure_revision()[2:]
+        if self._adj_key != key:
+            adj: Dict[str, List[Flow]] = {}
+            for flow in self.flows:
+                adj.setdefault(flow.from_node, []).append(flow)
+            self._adj = adj
+            self._adj_key = key
+        return self._adj
+
     def get_next_nodes(self, current_node_id: str, context: Dict[str, Any] = None) -> List[str]:
         context = context or {}
-        next_nodes = []
-        for flow in self.flows:
-            if flow.from_node == current_node_id:
-                if flow.condition:
-                    if flow.condition in ['true', 'false']:
-                        if self._evaluate_condition(flow.condition, context):
-                            next_nodes.append(flow.to_node)
-                    else:
-                        if self._evaluate_custom_condition(flow.condition, context):
-                            next_nodes.append(flow.to_node)
-                else:
-                    next_nodes.append(flow.to_node)
-        return next_nodes
+        return [flow.to_node for flow in self.adjacency().get(current_node_id, ())
+                if not flow.condition or self._evaluate_condition(flow.condition, context)]
 
     def _evaluate_condition(self, condition: str, context: Dict[str, Any]) -> bool:
-        if condition == 'true':
-            return True
-        if condition == 'false':
+        constant = _CONSTANT_CONDITIONS.get(condition)
+        if constant is not None:
+            return constant
+        predicate = _compile_condition(condition)
+        if predicate is None:
             return False
         try:
-            expr = condition
-            for key, value in context.items():
-                expr = expr.replace(key, f'"{value}"' if isinstance(value, str) else str(value))
-            return eval(expr, {"__builtins__": {}})
-        except:
+            # متغيرات السياق تُقرأ بالاسم بدلاً من استبدالها نصياً في التعبير
+            return predicate(context)
+        except Exception:
             return False
 
     def _evaluate_custom_condition(self, condition: str, context: Dict[str, Any]) -> bool:
         return self._evaluate_condition(condition, context)
 
+    def positions(self) -> np.ndarray:
+        """مواقع العقد كمصفوفة متجاورة (N, 2) لعمليات التخطيط المتجهة"""
+        key = self.structure_revision()[:2]
+        if self._positions is None or self._positions_key != key:
+            # النوع يُستنتج (int أو float) كي لا تُقتطع المواقع الكسرية
+            self._positions = np.array([node.position for node in self.nodes.values()]).reshape(-1, 2)
+            self._positions_key = key
+        return self._positions
+
     def to_dict(self) -> Dict[str, Any]:
+        # يُبنى في كل استدعاء: تعديل node.config أو المتغيرات مباشرة لا يمكن اكتشافه
+        return self._build_dict()
+
+    def to_json_bytes(self) -> bytes:
+        return json_dumps_bytes(self._build_dict())
+
+    def to_json(self) -> str:
+        return self.to_json_bytes().decode('utf-8')
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             'id': self.id,
             'name': self.name,
@@ -113,15 +224,37 @@ class Workflow:
             )
             wf.nodes[nid] = node
         for fdata in data.get('flows', []):
-            wf.flows.append(Flow(fdata['from_node'], fdata['to_node'], fdata.get('condition')))
+            wf.add_flow(Flow(fdata['from_node'], fdata['to_node'], fdata.get('condition')))
         return wf
 
     def save(self, filepath: str):
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        # كتابة تدريجية عنصراً عنصراً بدلاً من بناء النص كاملاً في الذاكرة
+        with open(filepath, 'wb') as f:
+            for chunk in self._iter_json_chunks(self._build_dict()):
+                f.write(chunk)
+
+    @staticmethod
+    def _iter_json_chunks(data: Dict[str, Any]):
+        yield b'{\n'
+        for i, (key, value) in enumerate(data.items()):
+            yield b',\n' if i else b''
+            yield json_dumps_bytes(key) + b': '
+            if key == 'nodes':
+                yield b'{'
+                for j, (nid, node) in enumerate(value.items()):
+                    yield b',\n  ' if j else b'\n  '
+                    yield json_dumps_bytes(nid) + b': ' + json_dumps_bytes(node, compact=True)
+                yield b'\n}' if value else b'}'
+            elif key == 'flows':
+                yield b'['
+                for j, flow in enumerate(value):
+                    yield b',\n  ' if j else b'\n  '
+                    yield json_dumps_bytes(flow, compact=True)
+                yield b'\n]' if value else b']'
+            else:
+                yield json_dumps_bytes(value, compact=True)
+        yield b'\n}\n'
 
     @classmethod
     def load(cls, filepath: str) -> 'Workflow':
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return cls.from_dict(data)
+        return cls.from_dict(json_loads(Path(filepath).read_bytes()))
@@ -1,30 +1,52 @@
 """
 المحرر المرئي للـ Workflow
 """
-import json
 import time
-from pathlib import Path
 from typing import Dict, Any
 from .viflow import Workflow
 import http.server
-import socketserver
 import webbrowser
 import threading
 
+class EditorHTTPServer(http.server.ThreadingHTTPServer):
+    """خادم متعدد الخيوط كي لا يحجب طلب واحد بقية طلبات المتصفح"""
+    allow_reuse_address = True
+    daemon_threads = True
+
 class VisualFlowEditor:
     def __init__(self, workflow: Workflow):
         self.workflow = workflow
         self.html_template = self._get_html_template()
+        # القالب مقسوم ومُرمَّز مسبقاً حول موضع بيانات الـ Workflow
+        prefix, suffix = self.html_template.split('{{WORKFLOW_DATA}}', 1)
+        self._html_prefix = prefix.encode('utf-8')
+        self._html_suffix = suffix.encode('utf-8')
+
+    def render_html(self) -> bytes:
+        return b''.join((self._html_prefix, self.workflow.to_json_bytes(), self._html_suffix))
 
     def save_html(self, filepath: str):
-        content = self.html_template.replace('{{WORKFLOW_DATA}}', json.dumps(self.workflow.to_dict(), ensure_ascii=False, indent=2))
-        Path(filepath).write_text(content, encoding='utf-8')
+        with open(filepath, 'wb') as f:
+            f.writelines((self._html_prefix, self.workflow.to_json_bytes(), self._html_suffix))
 
     def show(self, port: int = 8080):
-        handler = http.server.SimpleHTTPRequestHandler
+        editor = self
+
+        class EditorRequestHandler(http.server.BaseHTTPRequestHandler):
+            # الصفحة تُبنى من الذاكرة بدلاً من قراءة ملف من القرص لكل طلب
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/index.html'):
+                    self.send_error(404)
+                    return
+                body = editor.render_html()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
 
         def start_server():
-            with socketserver.TCPServer(("", port), handler) as httpd:
+            with EditorHTTPServer(("", port), EditorRequestHandler) as httpd:
                 print(f"🌐 مفتوح في المتصفح: http://localhost:{port}")
                 httpd.serve_forever()
 
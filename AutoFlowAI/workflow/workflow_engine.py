@@ -1,23 +1,126 @@
 """
 محرك تنفيذ Workflow
 """
+import asyncio
 import threading
 import time
 import logging
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Any, NamedTuple, Optional, Set, Tuple
 import uuid
 
-from .viflow import Workflow, Node, Flow
-from .workflow_models import WorkflowContext, NodeExecution, WorkflowStatus
+from .viflow import Workflow, Node, Flow, _compile_condition
+from .workflow_models import WorkflowContext, NodeHistory, WorkflowStatus
 from core.types import Task
+from utils.config import get_config
 
 logger = logging.getLogger("WorkflowEngine")
 
+# الحد الأقصى للعقد المتزامنة من كل نوع داخل الموجة الواحدة (الأنواع غير المذكورة بلا حد)
+NODE_TYPE_CONCURRENCY = {'ai_agent': 4, 'data_processing': 32}
+
+# تجميع مهام الـ Agent نفسه: مدة الانتظار القصوى بالثواني وحجم الدفعة الأقصى
+TASK_BATCH_WINDOW = 0.005
+TASK_BATCH_MAX = 16
+
+class _DataOp(NamedTuple):
+    """إعداد عقدة معالجة البيانات بعد تحليله مرة واحدة"""
+    run: Callable[['WorkflowEngine', '_DataOp', Dict[str, Any]], Dict[str, Any]]
+    operation: str
+    input_key: Optional[str]
+    output_key: Optional[str]
+    formula: Optional[str]
+    config: Dict[str, Any] # للتحقق من أن إعداد العقدة لم يُستبدل
+
+def _op_copy(engine: 'WorkflowEngine', op: _DataOp, variables: Dict[str, Any]) -> Dict[str, Any]:
+    return {op.output_key: variables.get(op.input_key)}
+
+def _op_calculate(engine: 'WorkflowEngine', op: _DataOp, variables: Dict[str, Any]) -> Dict[str, Any]:
+    return {op.output_key: engine._evaluate_condition(op.formula, variables)}
+
+def _op_unsupported(engine: 'WorkflowEngine', op: _DataOp, variables: Dict[str, Any]) -> Dict[str, Any]:
+    return {'note': f'عملية غير مدعومة: {op.operation}'}
+
+_DATA_OPS = {'copy': _op_copy, 'calculate': _op_calculate}
+
+def _compile_data_op(config: Dict[str, Any]) -> _DataOp:
+    operation = config.get('operation', 'copy')
+    input_key = config.get('input_key')
+    run = _DATA_OPS.get(operation, _op_unsupported)
+    if run is _op_copy and not input_key:
+        run = _op_unsupported
+    return _DataOp(run, operation, input_key, config.get('output_key', input_key), config.get('formula'), config)
+
+@dataclass
+class _ExecutionGraph:
+    """بنية الـ Workflow المحسوبة مسبقاً للجدولة على شكل موجات"""
+    start_nodes: List[str]
+    successors: Dict[str, List[str]] # عقدة لكل رابط، للعقد القابلة للوصول من البداية
+    indegree: Dict[str, int]
+    is_dag: bool
+    revision: tuple # Workflow.structure_revision() وقت البناء
+    data_ops: Dict[str, _DataOp]
+
+def _build_execution_graph(workflow: Workflow) -> _ExecutionGraph:
+    start_nodes = [nid for nid, n in workflow.nodes.items() if n.type == 'start']
+    # يُعاد استخدام فهرس الروابط الخارجة في الـ Workflow بدلاً من مسح الروابط مرة أخرى
+    successors = {nid: [flow.to_node for flow in flows] for nid, flows in workflow.adjacency().items()}
+
+    # الروابط القادمة من عقد لا يمكن الوصول إليها لا تُحسب في درجة الدخول
+    reachable = set(start_nodes)
+    stack = list(start_nodes)
+    while stack:
+        for succ in successors.get(stack.pop(), ()):
+            if succ not in reachable:
+                reachable.add(succ)
+                stack.append(succ)
+    successors = {nid: succ for nid, succ in successors.items() if nid in reachable}
+    indegree = dict.fromkeys(reachable, 0)
+    for succ_list in successors.values():
+        for succ in succ_list:
+            indegree[succ] += 1
+
+    # Kahn: وجود دورة يعني الرجوع إلى التنفيذ الخطي
+    remaining = dict(indegree)
+    queue = [nid for nid, d in remaining.items() if d == 0]
+    visited = 0
+    while queue:
+        visited += 1
+        for succ in successors.get(queue.pop(), ()):
+            remaining[succ] -= 1
+            if remaining[succ] == 0:
+                queue.append(succ)
+
+    data_ops = {nid: _compile_data_op(n.config) for nid, n in workflow.nodes.items() if n.type == 'data_processing'}
+
+    return _ExecutionGraph(start_nodes, successors, indegree, visited == len(reachable),
+                           workflow.structure_revision(), data_ops)
+
 class WorkflowEngine:
-    def __init__(self, autoflowai=None):
+    def __init__(self, autoflowai=None, max_workers: int = 8, max_completed: Optional[int] = None):
         self.workflows: Dict[str, Workflow] = {}
         self.running_executions: Dict[str, WorkflowContext] = {}
+        # العمليات المنتهية تُنقل إلى هنا ويُحذف الأقدم عند تجاوز الحد
+        self.completed_executions: "OrderedDict[str, WorkflowContext]" = OrderedDict()
+        self.max_completed = (max_completed if max_completed is not None
+                              else get_config().workflow.max_completed_executions)
+        # فهرس عمليات التنفيذ حسب الـ Workflow لتجنب مسح جميع العمليات
+        self._by_workflow: Dict[str, Dict[str, WorkflowContext]] = {}
         self.autoflowai = autoflowai
+        # حلقة أحداث واحدة تخدم جميع عمليات التنفيذ؛ الاستدعاءات الحاجبة تذهب إلى مجمّع محدود
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-worker")
+        self._graphs: Dict[str, _ExecutionGraph] = {}
+        self.node_type_limits = dict(NODE_TYPE_CONCURRENCY)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.batch_window = TASK_BATCH_WINDOW
+        self.batch_max = TASK_BATCH_MAX
+        self._batch_queues: Dict[str, List[Tuple[Task, asyncio.Future]]] = {}
+        self._batch_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._batch_runs: Set[asyncio.Task] = set()
         self.node_handlers = {
             'start': self._handle_start_node,
             'end': self._handle_end_node,
@@ -27,8 +130,24 @@ class WorkflowEngine:
             'delay': self._handle_delay_node
         }
 
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="workflow-loop", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def shutdown(self):
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+        self._executor.shutdown(wait=False)
+
     def register_workflow(self, workflow: Workflow):
         self.workflows[workflow.id] = workflow
+        self._graphs[workflow.id] = _build_execution_graph(workflow)
         logger.info(f"تم تسجيل workflow: {workflow.name}")
 
     def execute_workflow(self, workflow_id: str, input_data: Dict[str, Any] = None, execution_id: str = None) -> str:
@@ -47,50 +166,37 @@ class WorkflowEngine:
         )
 
         self.running_executions[execution_id] = context
+        self._by_workflow.setdefault(workflow_id, {})[execution_id] = context
         logger.info(f"بدء تنفيذ workflow: {workflow_id} (execution_id: {execution_id})")
 
-        # تشغيل في thread منفصل
-        thread = threading.Thread(target=self._execute_workflow_thread, args=(workflow_id, execution_id), daemon=True)
-        thread.start()
+        # جدولة التنفيذ كـ coroutine على حلقة الأحداث المشتركة
+        asyncio.run_coroutine_threadsafe(self._execute_workflow_coro(workflow_id, execution_id), self._get_loop())
 
         return execution_id
 
-    def _execute_workflow_thread(self, workflow_id: str, execution_id: str):
+    def _get_graph(self, workflow: Workflow) -> _ExecutionGraph:
+        graph = self._graphs.get(workflow.id)
+        if graph is None or graph.revision != workflow.structure_revision():
+            graph = self._graphs[workflow.id] = _build_execution_graph(workflow)
+        return graph
+
+    async def _execute_workflow_coro(self, workflow_id: str, execution_id: str):
         try:
             workflow = self.workflows[workflow_id]
             context = self.running_executions[execution_id]
+            graph = self._get_graph(workflow)
 
-            # العثور على عقدة البداية
-            start_nodes = [n for n in workflow.nodes.values() if n.type == 'start']
-            if not start_nodes:
+            if not graph.start_nodes:
                 raise ValueError("لا توجد عقدة بداية")
 
-            current_node = start_nodes[0]
-            context.current_node = current_node.id
+            context.current_node = graph.start_nodes[0]
             context.variables.update(workflow.variables)
             context.variables.update(context.input_data)
 
-            # تنفيذ الخطوات
-            while current_node and context.status == WorkflowStatus.RUNNING:
-                self._execute_node(workflow, current_node, context)
-
-                # التحقق من انتهاء التنفيذ
-                if current_node.type == 'end':
-                    context.status = WorkflowStatus.COMPLETED
-                    context.completed_at = time.time()
-                    break
-
-                # الانتقال للعقد التالية
-                next_nodes = workflow.get_next_nodes(current_node.id, context.variables)
-                if not next_nodes:
-                    logger.warning(f"لا توجد عقدة تالية من {current_node.id}")
-                    context.status = WorkflowStatus.COMPLETED
-                    context.completed_at = time.time()
-                    break
-
-                next_node_id = next_nodes[0]
-                current_node = workflow.nodes.get(next_node_id)
-                context.current_node = current_node.id if current_node else None
+            if graph.is_dag:
+                await self._run_waves(workflow, graph, context)
+            else:
+                await self._run_linear(workflow, workflow.nodes[graph.start_nodes[0]], context)
 
             logger.info(f"انتهاء تنفيذ workflow: {execution_id} - الحالة: {context.status}")
 
@@ -100,54 +206,148 @@ class WorkflowEngine:
             context.completed_at = time.time()
             logger.error(f"خطأ في تنفيذ workflow {execution_id}: {e}")
 
-    def _execute_node(self, workflow: Workflow, node: Node, context: WorkflowContext):
+        finally:
+            self._retire_execution(execution_id)
+
+    def _retire_execution(self, execution_id: str):
+        """نقل عملية منتهية من العمليات الجارية إلى سجل المنتهية المحدود"""
+        context = self.running_executions.get(execution_id)
+        if context is None:
+            return
+        # الإضافة قبل الحذف كي لا تختفي العملية عن القراءة من خيط آخر
+        self.completed_executions[execution_id] = context
+        del self.running_executions[execution_id]
+        while len(self.completed_executions) > self.max_completed:
+            old_id, old = self.completed_executions.popitem(last=False)
+            executions = self._by_workflow.get(old.workflow_id)
+            if executions is not None:
+                executions.pop(old_id, None)
+                if not executions:
+                    del self._by_workflow[old.workflow_id]
+
+    def _find_execution(self, execution_id: str) -> Optional[WorkflowContext]:
+        context = self.running_executions.get(execution_id)
+        return context if context is not None else self.completed_executions.get(execution_id)
+
+    async def _run_waves(self, workflow: Workflow, graph: _ExecutionGraph, context: WorkflowContext):
+        """تنفيذ كل العقد الجاهزة معاً؛ العقدة تجهز عندما تنتهي كل العقد السابقة لها"""
+        remaining = dict(graph.indegree)
+        activated: Set[str] = set()
+        scheduled: Set[str] = set(graph.start_nodes)
+        wave = list(graph.start_nodes)
+
+        def release(node_id: str, next_wave: List[str], skipped: List[str]):
+            remaining[node_id] -= 1
+            if remaining[node_id] == 0 and node_id not in scheduled:
+                scheduled.add(node_id)
+                # عقدة لم يُتبع إليها أي رابط تُتخطى ويُنقل التخطي إلى ما بعدها
+                (next_wave if node_id in activated else skipped).append(node_id)
+
+        while wave and context.status == WorkflowStatus.RUNNING:
+            nodes = [workflow.nodes[nid] for nid in wave if nid in workflow.nodes]
+            context.current_node = nodes[-1].id if nodes else None
+            await asyncio.gather(*(self._execute_node_limited(workflow, node, context) for node in nodes))
+
+            if any(node.type == 'end' for node in nodes):
+                context.status = WorkflowStatus.COMPLETED
+                context.completed_at = time.time()
+                return
+
+            next_wave: List[str] = []
+            skipped: List[str] = []
+            for node in nodes:
+                taken = set(workflow.get_next_nodes(node.id, context.variables))
+                for succ in graph.successors.get(node.id, ()):
+                    if succ in taken:
+                        activated.add(succ)
+                    release(succ, next_wave, skipped)
+            while skipped:
+                for succ in graph.successors.get(skipped.pop(), ()):
+                    release(succ, next_wave, skipped)
+            wave = next_wave
+
+        if context.status == WorkflowStatus.RUNNING:
+            logger.warning(f"لا توجد عقدة تالية من {context.current_node}")
+            context.status = WorkflowStatus.COMPLETED
+            context.completed_at = time.time()
+
+    async def _run_linear(self, workflow: Workflow, current_node: Node, context: WorkflowContext):
+        """المسار الخطي للـ Workflows التي تحتوي على دورات"""
+        while current_node and context.status == WorkflowStatus.RUNNING:
+            await self._execute_node(workflow, current_node, context)
+
+            # التحقق من انتهاء التنفيذ
+            if current_node.type == 'end':
+                context.status = WorkflowStatus.COMPLETED
+                context.completed_at = time.time()
+                break
+
+            # الانتقال للعقد التالية
+            next_nodes = workflow.get_next_nodes(current_node.id, context.variables)
+            if not next_nodes:
+                logger.warning(f"لا توجد عقدة تالية من {current_node.id}")
+                context.status = WorkflowStatus.COMPLETED
+                context.completed_at = time.time()
+                break
+
+            next_node_id = next_nodes[0]
+            current_node = workflow.nodes.get(next_node_id)
+            context.current_node = current_node.id if current_node else None
+
+    async def _execute_node_limited(self, workflow: Workflow, node: Node, context: WorkflowContext):
+        limit = self.node_type_limits.get(node.type)
+        if limit is None:
+            return await self._execute_node(workflow, node, context)
+        semaphore = self._semaphores.get(node.type)
+        if semaphore is None:
+            semaphore = self._semaphores[node.type] = asyncio.Semaphore(limit)
+        async with semaphore:
+            return await self._execute_node(workflow, node, context)
+
+    async def _execute_node(self, workflow: Workflow, node: Node, context: WorkflowContext):
         logger.info(f"تنفيذ عقدة: {node.name} ({node.type})")
 
         step_start = time.time()
-        node_execution = NodeExecution(
-            node_id=node.id,
-            node_name=node.name,
-            node_type=node.type,
-            status="running"
-        )
-        context.history.append(node_execution.__dict__)
+        history = context.history
+        seq = history.start(node.id, step_start)
 
         try:
             handler = self.node_handlers.get(node.type, self._handle_unknown_node)
-            result = handler(workflow, node, context)
+            result = await handler(workflow, node, context)
 
-            node_execution.status = "completed"
-            node_execution.completed_at = time.time()
-            node_execution.duration = node_execution.completed_at - step_start
-            node_execution.result = result
+            history.finish(seq, NodeHistory.COMPLETED, time.time() - step_start)
 
             context.results[node.id] = result
             if isinstance(result, dict):
                 context.variables.update(result)
 
         except Exception as e:
-            node_execution.status = "failed"
-            node_execution.completed_at = time.time()
-            node_execution.duration = node_execution.completed_at - step_start
-            node_execution.error = str(e)
+            history.finish(seq, NodeHistory.FAILED, time.time() - step_start, str(e))
             raise
 
-    def _handle_start_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
+    async def _handle_start_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
         return {'message': 'بداية التنفيذ'}
 
-    def _handle_end_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
+    async def _handle_end_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
         return {'message': 'انتهاء التنفيذ', 'final_results': context.results}
 
-    def _handle_ai_agent_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
+    async def _handle_ai_agent_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
         if not self.autoflowai or not node.agent_id:
             return {'note': 'لا يوجد autoflowai أو agent_id', 'mock': True}
 
-        # تنفيذ المهمة عبر الـ Agent
+        # حقول السياق تُرسل فقط إذا طلبها الـ Agent صراحة عبر context_fields
+        workflow_context = {'execution_id': context.execution_id}
+        for name in node.config.get('context_fields', ()):
+            if hasattr(context, name):
+                workflow_context[name] = getattr(context, name)
+
+        # تنفيذ المهمة عبر الـ Agent؛ المتغيرات تُنسخ وقت الإرسال لأن الموجات المتوازية
+        # تستمر في الكتابة عليها بينما ينتظر الـ Agent نافذة التجميع
         task_data = {
             'type': 'workflow_task',
-            'data': context.variables.copy(),
+            'data': context.snapshot(),
             'node_config': node.config,
-            'workflow_context': context.__dict__
+            'workflow_context': workflow_context
         }
 
         task = Task(
@@ -158,7 +358,7 @@ class WorkflowEngine:
         )
 
         try:
-            result = self.autoflowai.core.execute_task(node.agent_id, task)
+            result = await self._submit_task(node.agent_id, task)
             return {
                 'agent_id': node.agent_id,
                 'task_result': result,
@@ -171,61 +371,118 @@ class WorkflowEngine:
                 'executed_at': time.time()
             }
 
-    def _handle_condition_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
+    async def _call_core(self, method: Callable, *args) -> Any:
+        if asyncio.iscoroutinefunction(method):
+            # نواة غير متزامنة لا تحتاج خيطاً من المجمّع
+            return await method(*args)
+        # التنفيذ المتزامن يعمل خارج حلقة الأحداث فيُحرَّر الـ GIL أثناء الانتظار
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    async def _submit_task(self, agent_id: str, task: Task) -> Any:
+        """إرسال مهمة إلى الـ Agent؛ تُجمَّع مع مهام الـ Agent نفسه إن دعمت النواة execute_tasks"""
+        core = self.autoflowai.core
+        if not hasattr(core, 'execute_tasks'):
+            return await self._call_core(core.execute_task, agent_id, task)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._batch_queues.setdefault(agent_id, [])
+        queue.append((task, future))
+        if len(queue) >= self.batch_max:
+            self._flush_batch(agent_id)
+        elif agent_id not in self._batch_timers:
+            self._batch_timers[agent_id] = loop.call_later(self.batch_window, self._flush_batch, agent_id)
+        return await future
+
+    def _flush_batch(self, agent_id: str):
+        timer = self._batch_timers.pop(agent_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batch_queues.pop(agent_id, None)
+        if batch:
+            run = asyncio.ensure_future(self._run_batch(agent_id, batch))
+            self._batch_runs.add(run)
+            run.add_done_callback(self._batch_runs.discard)
+
+    async def _run_batch(self, agent_id: str, batch: List[Tuple[Task, asyncio.Future]]):
+        try:
+            results = list(await self._call_core(self.autoflowai.core.execute_tasks, agent_id, [t for t, _ in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(f"execute_tasks أعاد {len(results)} نتيجة لـ {len(batch)} مهمة")
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # الإلغاء لا يُلتقط أعلاه؛ لا يبقى أي مستقبل معلقاً في كل الأحوال
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def _handle_condition_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
         condition = node.condition or node.config.get('condition', 'true')
         result = self._evaluate_condition(condition, context.variables)
         return {'condition_result': result, 'condition': condition}
 
-    def _handle_data_processing_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
-        operation = node.config.get('operation', 'copy')
-        input_key = node.config.get('input_key')
-        output_key = node.config.get('output_key', input_key)
-
-        if operation == 'copy' and input_key:
-            return {output_key: context.variables.get(input_key)}
-        elif operation == 'calculate':
-            formula = node.config.get('formula')
-            result = self._evaluate_condition(formula, context.variables)
-            return {output_key: result}
-        else:
-            return {'note': f'عملية غير مدعومة: {operation}'}
-
-    def _handle_delay_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
+    async def _handle_data_processing_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
+        # الإعداد يُحلَّل عند تسجيل الـ Workflow؛ يُعاد تحليله فقط إذا استُبدل
+        data_ops = self._get_graph(workflow).data_ops
+        op = data_ops.get(node.id)
+        if op is None or op.config is not node.config:
+            op = data_ops[node.id] = _compile_data_op(node.config)
+        return op.run(self, op, context.variables)
+
+    async def _handle_delay_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
         delay_seconds = node.config.get('seconds', 1)
-        time.sleep(delay_seconds)
+        await asyncio.sleep(delay_seconds)
         return {'delayed_seconds': delay_seconds}
 
-    def _handle_unknown_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
+    async def _handle_unknown_node(self, workflow: Workflow, node: Node, context: WorkflowContext) -> Dict[str, Any]:
         return {'note': f'نوع عقدة غير مدعوم: {node.type}'}
 
     def _evaluate_condition(self, condition: str, variables: Dict[str, Any]) -> bool:
         try:
-            expr = condition
-            for key, value in variables.items():
-                if isinstance(value, str):
-                    expr = expr.replace(key, f'"{value}"')
-                else:
-                    expr = expr.replace(key, str(value))
-            return eval(expr, {"__builtins__": {}})
+            # التعبير يُترجم مرة واحدة (ذاكرة مشتركة مع Workflow) والمتغيرات تُقرأ بالاسم
+            predicate = _compile_condition(condition)
+            if predicate is None:
+                raise SyntaxError("تعبير غير صالح")
+            return predicate(variables)
         except Exception as e:
             logger.warning(f"خطأ في تقييم الشرط: {condition} - {e}")
             return False
 
+    @staticmethod
+    def _summarize(context: WorkflowContext) -> Dict[str, Any]:
+        """ملخص خفيف لعملية التنفيذ دون المتغيرات والنتائج والسجل"""
+        return {
+            'execution_id': context.execution_id,
+            'workflow_id': context.workflow_id,
+            'status': context.status.value,
+            'current_node': context.current_node,
+            'started_at': context.started_at,
+            'completed_at': context.completed_at,
+            'error': context.error,
+            'results_count': len(context.results),
+            'history_count': context.history.total
+        }
+
     def get_execution_status(self, execution_id: str) -> Optional[Dict[str, Any]]:
-        context = self.running_executions.get(execution_id)
-        if context:
-            return {
-                'execution_id': execution_id,
-                'workflow_id': context.workflow_id,
-                'status': context.status.value,
-                'current_node': context.current_node,
-                'started_at': context.started_at,
-                'completed_at': context.completed_at,
-                'error': context.error,
-                'results_count': len(context.results),
-                'history_count': len(context.history)
-            }
-        return None
+        context = self._find_execution(execution_id)
+        return self._summarize(context) if context else None
+
+    def get_full_execution(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """الحالة الكاملة لعملية تنفيذ، بما فيها السجل بعد تحويله إلى قواميس"""
+        context = self._find_execution(execution_id)
+        if context is None:
+            return None
+        return {**context.__dict__, 'history': context.history.to_dicts()}
+
+    def get_history(self, execution_id: str) -> Optional[List[Dict[str, Any]]]:
+        context = self._find_execution(execution_id)
+        return context.history.to_dicts() if context else None
 
     def get_workflow_executions(self, workflow_id: str) -> List[Dict[str, Any]]:
-        return [ctx.__dict__ for ctx in self.running_executions.values() if ctx.workflow_id == workflow_id]
+        return [self._summarize(ctx) for ctx in list(self._by_workflow.get(workflow_id, {}).values())]
@@ -1,11 +1,16 @@
 """
 نماذج البيانات للـ Workflow
 """
+from array import array
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 from enum import Enum
+import sys
 import time
 
+# slots=True متاح في dataclasses ابتداءً من Python 3.10
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 class WorkflowStatus(Enum):
     CREATED = "created"
     RUNNING = "running"
@@ -22,6 +27,59 @@ class NodeType(Enum):
     DELAY = "delay"
     PARALLEL = "parallel"
 
+class NodeHistory:
+    """سجل تنفيذ العقد بأعمدة متوازية في حلقة ذات سعة ثابتة (الأقدم يُستبدل)"""
+
+    STATUSES = ("pending", "running", "completed", "failed")
+    RUNNING, COMPLETED, FAILED = 1, 2, 3
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.node_ids: List[Optional[str]] = [None] * capacity
+        self.started_at = array('d', bytes(8 * capacity))
+        self.duration = array('d', bytes(8 * capacity))
+        self.status = array('b', bytes(capacity))
+        self.errors: Dict[int, str] = {}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def start(self, node_id: str, started_at: float) -> int:
+        """تسجيل بدء عقدة؛ يُرجع رقم التسلسل لاستخدامه في finish"""
+        seq = self.total
+        slot = seq % self.capacity
+        self.node_ids[slot] = node_id
+        self.started_at[slot] = started_at
+        self.duration[slot] = 0.0
+        self.status[slot] = self.RUNNING
+        self.errors.pop(seq - self.capacity, None)
+        self.total += 1
+        return seq
+
+    def finish(self, seq: int, status: int, duration: float, error: Optional[str] = None):
+        if seq < self.total - self.capacity:
+            return # استُبدل السجل بالفعل
+        slot = seq % self.capacity
+        self.status[slot] = status
+        self.duration[slot] = duration
+        if error is not None:
+            self.errors[seq] = error
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """بناء القواميس عند الطلب فقط، من الأقدم إلى الأحدث"""
+        out = []
+        for seq in range(max(0, self.total - self.capacity), self.total):
+            slot = seq % self.capacity
+            out.append({
+                'node_id': self.node_ids[slot],
+                'status': self.STATUSES[self.status[slot]],
+                'started_at': self.started_at[slot],
+                'duration': self.duration[slot],
+                'error': self.errors.get(seq)
+            })
+        return out
+
 @dataclass
 class WorkflowContext:
     """سياق تنفيذ الـ Workflow"""
@@ -35,9 +93,13 @@ class WorkflowContext:
     started_at: float = field(default_factory=time.time)
     completed_at: Optional[float] = None
     error: Optional[str] = None
-    history: List[Dict[str, Any]] = field(default_factory=list)
+    history: NodeHistory = field(default_factory=NodeHistory)
 
-@dataclass
+    def snapshot(self) -> Dict[str, Any]:
+        """نسخة مستقلة من المتغيرات وقت الاستدعاء، لا تتأثر بالكتابات اللاحقة"""
+        return dict(self.variables)
+
+@dataclass(**_SLOTS)
 class NodeExecution:
     """تنفيذ عقدة واحدة"""
     node_id: str
@@ -9,6 +9,7 @@ import random
 import uuid
 from datetime import datetime
 from typing import Dict, List, Any, Optional
+from src.config import FeatureFlag
 
 class AIAgent:
     """Individual AI agent"""
@@ -341,7 +342,7 @@ class AgentManager:
 
     async def update_agent_genealogy(self):
         """Update agent genealogy (Feature 5)"""
-        if not self.system.config.feature_flags.get("agent_genealogy"):
+        if not (self.system.config.feature_flags & FeatureFlag.AGENT_GENEALOGY):
             return
 
         self.logger.info("📊 Agent genealogy updated")
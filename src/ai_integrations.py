@@ -5,20 +5,28 @@ LangChain, LlamaIndex, Vector DBs, LLM Providers
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
-from langchain.llms import OpenAI, Anthropic, HuggingFaceHub
-from langchain.vectorstores import Weaviate, Qdrant, FAISS
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.agents import initialize_agent, Tool
-from llama_index import (
-    GPTVectorStoreIndex,
-    SimpleDirectoryReader,
-    LLMPredictor,
-    ServiceContext
-)
-from llama_index.vector_stores import WeaviateVectorStore
-import weaviate
-from qdrant_client import QdrantClient
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
+
+# Heavy integrations are imported inside the methods that use them so that
+# importing this module (and starting the server) doesn't pay for them.
+if TYPE_CHECKING:
+    from langchain.agents import Tool
+
+# Embedding models are loaded once per model name, on first use
+_EMBEDDINGS: Dict[str, Any] = {}
+_EMBEDDINGS_LOCK = asyncio.Lock()
+
+async def get_embeddings(model_name: str):
+    """Return the shared HuggingFace embeddings for a model, loading it off the event loop"""
+    embeddings = _EMBEDDINGS.get(model_name)
+    if embeddings is None:
+        async with _EMBEDDINGS_LOCK:
+            embeddings = _EMBEDDINGS.get(model_name)
+            if embeddings is None:
+                from langchain.embeddings import HuggingFaceEmbeddings
+                embeddings = await asyncio.to_thread(HuggingFaceEmbeddings, model_name=model_name)
+                _EMBEDDINGS[model_name] = embeddings
+    return embeddings
 
 class LangChainManager:
     """Manages LangChain integrations"""
@@ -33,6 +41,7 @@ class LangChainManager:
     async def initialize(self):
         """Initialize LangChain components"""
         self.logger.info("🔗 Initializing LangChain...")
+        from langchain.llms import OpenAI
 
         # Initialize LLM
         provider = self.config.langchain.model_provider
@@ -47,6 +56,9 @@ class LangChainManager:
         # Initialize vector store
         vector_type = self.config.langchain.vector_store
         if vector_type == "weaviate":
+            import weaviate
+            from langchain.vectorstores import Weaviate
+
             client = weaviate.Client(
                 url=self.config.vector_db.weaviate.url,
                 auth_client_secret=weaviate.auth.AuthApiKey(
@@ -56,19 +68,22 @@ class LangChainManager:
             self.vector_store = Weaviate(client, "Document", "content")
 
         elif vector_type == "qdrant":
+            from qdrant_client import QdrantClient
+            from langchain.vectorstores import Qdrant
+
             qdrant_client = QdrantClient(
                 url=self.config.vector_db.qdrant.url,
                 api_key=self.config.vector_db.qdrant.api_key
             )
-            embeddings = HuggingFaceEmbeddings(
-                model_name=self.config.llama_index.embedding_model
-            )
+            embeddings = await get_embeddings(self.config.llama_index.embedding_model)
             self.vector_store = Qdrant(qdrant_client, "documents", embeddings)
 
         self.logger.info("✅ LangChain initialized")
 
-    async def create_agent(self, tools: List[Tool]):
+    async def create_agent(self, tools: List["Tool"]):
         """Create LangChain agent"""
+        from langchain.agents import initialize_agent
+
         self.agent = initialize_agent(
             tools,
             self.llm,
@@ -96,6 +111,8 @@ class LlamaIndexManager:
     async def initialize(self):
         """Initialize LlamaIndex"""
         self.logger.info("📚 Initializing LlamaIndex...")
+        from langchain.llms import OpenAI
+        from llama_index import GPTVectorStoreIndex, LLMPredictor, ServiceContext
 
         # Setup LLM predictor
         llm_predictor = LLMPredictor(
@@ -112,6 +129,9 @@ class LlamaIndexManager:
 
         # Initialize vector store if configured
         if self.config.vector_db.weaviate.enabled:
+            import weaviate
+            from llama_index.vector_stores import WeaviateVectorStore
+
             vector_store = WeaviateVectorStore(
                 weaviate_client=weaviate.Client(self.config.vector_db.weaviate.url),
                 index_name="LlamaIndex"
@@ -127,6 +147,7 @@ class LlamaIndexManager:
         """Build index from documents"""
         if not self.service_context:
             await self.initialize()
+        from llama_index import GPTVectorStoreIndex, SimpleDirectoryReader
 
         documents = SimpleDirectoryReader(documents_path).load_data()
         self.index = GPTVectorStoreIndex.from_documents(
@@ -157,9 +178,7 @@ class VectorDBManager:
         self.weaviate_client = None
         self.qdrant_client = None
         self.faiss_index = None
-        self.embedding_function = HuggingFaceEmbeddings(
-            model_name=self.config.llama_index.embedding_model
-        )
+        self.embedding_function = None
 
     async def initialize(self):
         """Initialize all vector DBs"""
@@ -167,6 +186,7 @@ class VectorDBManager:
 
         # Weaviate
         if self.config.vector_db.weaviate.enabled:
+            import weaviate
             self.weaviate_client = weaviate.Client(
                 url=self.config.vector_db.weaviate.url,
                 additional_headers={
@@ -177,10 +197,12 @@ class VectorDBManager:
 
         # Qdrant
         if self.config.vector_db.qdrant.enabled:
+            from qdrant_client import QdrantClient
             self.qdrant_client = QdrantClient(
                 url=self.config.vector_db.qdrant.url,
                 api_key=self.config.vector_db.qdrant.api_key
             )
+            self.embedding_function = await get_embeddings(self.config.llama_index.embedding_model)
 
         self.logger.info("✅ Vector DBs initialized")
 
@@ -6,13 +6,19 @@ Features 66-75: Self-Development and Evolution
 import asyncio
 import logging
 import json
-import random
 import os
 import shutil
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Deque, Dict, List, Any, Optional
 import ast
 import hashlib
+import numpy as np
+from src.config import FeatureFlag
+
+IDEA_TYPES = np.array(["architectural", "behavioral", "optimization"])
+_rng = np.random.default_rng()
+PATCH_CACHE_SIZE = 1024
 
 class AutonomousCodeGenerationModule:
     """Self-evolving code generation system"""
@@ -20,8 +26,12 @@ class AutonomousCodeGenerationModule:
     def __init__(self, system):
         self.system = system
         self.logger = logging.getLogger("CodeGeneration")
-        self.code_versions: List[Dict[str, Any]] = []
         self.max_versions = 100
+        # Bounded history: old versions are evicted on append without copying
+        self.code_versions: Deque[Dict[str, Any]] = deque(maxlen=self.max_versions)
+        self._version_counter = 0
+        # LRU of patch digest -> syntax validity; generated patches repeat often
+        self._patch_valid_cache: "OrderedDict[bytes, bool]" = OrderedDict()
 
     async def initialize(self):
         """Initialize code generation module"""
@@ -29,7 +39,7 @@ class AutonomousCodeGenerationModule:
 
     async def generate_optimization_patch(self, performance_metrics: Dict) -> str:
         """Generate code optimization based on performance"""
-        if not self.system.config.feature_flags.get("architectural_evolution"):
+        if not (self.system.config.feature_flags & FeatureFlag.ARCHITECTURAL_EVOLUTION):
             return "Evolution disabled"
 
         # Analyze bottlenecks
@@ -80,55 +90,70 @@ class AutonomousCodeGenerationModule:
 
     async def _validate_patch(self, patch: str) -> bool:
         """Validate code patch"""
+        key = hashlib.blake2b(patch.encode(), digest_size=16).digest()
+        cached = self._patch_valid_cache.get(key)
+        if cached is not None:
+            self._patch_valid_cache.move_to_end(key)
+            return cached
+
         try:
             ast.parse(patch)
-            return True
+            valid = True
         except SyntaxError:
-            return False
+            valid = False
+
+        self._patch_valid_cache[key] = valid
+        if len(self._patch_valid_cache) > PATCH_CACHE_SIZE:
+            self._patch_valid_cache.popitem(last=False)
+        return valid
 
     async def _deploy_patch(self, patch: str):
         """Deploy optimization patch"""
+        # A monotonic counter keeps version ids unique after eviction
         version = {
-            "version_id": f"v_{len(self.code_versions)}_{int(datetime.now().timestamp())}",
+            "version_id": f"v_{self._version_counter}_{int(datetime.now().timestamp())}",
             "patch": patch,
             "timestamp": datetime.now().isoformat(),
             "status": "deployed"
         }
 
+        self._version_counter += 1
         self.code_versions.append(version)
 
-        # Keep only recent versions
-        if len(self.code_versions) > self.max_versions:
-            self.code_versions = self.code_versions[-self.max_versions:]
-
         self.logger.info(f"✅ Deployed optimization: {version['version_id']}")
 
     async def generate_spontaneous_ideas(self) -> List[Dict[str, Any]]:
         """Spontaneous evolution ideas (Feature 66)"""
-        if not self.system.config.feature_flags.get("spontaneous_evolution"):
+        if not (self.system.config.feature_flags & FeatureFlag.SPONTANEOUS_EVOLUTION):
             return []
 
-        ideas = []
-        generation_rate = self.system.config.advanced_features.spontaneous_evolution.idea_generation_rate
-
-        for _ in range(min(generation_rate, 10)): # Limit max
-            idea = {
-                "id": f"idea_{random.randint(1000, 9999)}",
-                "type": random.choice(["architectural", "behavioral", "optimization"]),
-                "description": f"Novel approach #{random.randint(1, 1000)}",
-                "novelty_score": random.uniform(0.5, 1.0),
-                "feasibility": random.uniform(0.3, 0.9)
+        settings = self.system.config.advanced_features.spontaneous_evolution
+        n = min(settings.idea_generation_rate, 10) # Limit max
+
+        # Draw every random field for the batch at once
+        ids = _rng.integers(1000, 10000, n)
+        types = _rng.choice(IDEA_TYPES, n)
+        approaches = _rng.integers(1, 1001, n)
+        novelty = _rng.uniform(0.5, 1.0, n)
+        feasibility = _rng.uniform(0.3, 0.9, n)
+
+        ideas = [
+            {
+                "id": f"idea_{ids[i]}",
+                "type": str(types[i]),
+                "description": f"Novel approach #{approaches[i]}",
+                "novelty_score": float(novelty[i]),
+                "feasibility": float(feasibility[i])
             }
-
-            if idea["novelty_score"] > self.system.config.advanced_features.spontaneous_evolution.creativity_threshold:
-                ideas.append(idea)
+            for i in np.flatnonzero(novelty > settings.creativity_threshold)
+        ]
 
         self.logger.info(f"💡 Generated {len(ideas)} spontaneous ideas")
         return ideas
 
     async def multi_objective_evolution(self):
         """Multi-objective optimization (Feature 68)"""
-        if not self.system.config.feature_flags.get("multi_objective_evolution"):
+        if not (self.system.config.feature_flags & FeatureFlag.MULTI_OBJECTIVE_EVOLUTION):
             return
 
         objectives = self.system.config.advanced_features.multi_objective_evolution.objectives
@@ -140,21 +165,33 @@ class AutonomousCodeGenerationModule:
 
     def _calculate_pareto_front(self, objectives: List[str]) -> List[Dict]:
         """Calculate Pareto front for multi-objective optimization"""
-        # Simplified Pareto front calculation
-        solutions = []
-
-        for obj in objectives:
-            solutions.append({
-                "objective": obj,
-                "value": random.uniform(0.5, 1.0),
-                "trade_offs": [random.uniform(0.3, 0.7) for _ in objectives if _ != obj]
-            })
+        k = len(objectives)
+        if k == 0:
+            return []
 
-        return solutions
+        # One candidate per objective: row i scores every objective, with the
+        # candidate's own objective on the diagonal and trade-offs elsewhere
+        scores = _rng.uniform(0.3, 0.7, size=(k, k))
+        np.fill_diagonal(scores, _rng.uniform(0.5, 1.0, size=k))
+
+        # dominates[i, j]: candidate i is at least as good everywhere and better somewhere
+        ge = (scores[:, None, :] >= scores[None, :, :]).all(axis=2)
+        gt = (scores[:, None, :] > scores[None, :, :]).any(axis=2)
+        front = np.flatnonzero(~(ge & gt).any(axis=0))
+
+        off_diagonal = ~np.eye(k, dtype=bool)
+        return [
+            {
+                "objective": objectives[i],
+                "value": float(scores[i, i]),
+                "trade_offs": scores[i, off_diagonal[i]].tolist()
+            }
+            for i in front
+        ]
 
     async def evolve_evolution_code(self):
         """Recursive evolution (Feature 75)"""
-        if not self.system.config.feature_flags.get("recursive_evolution"):
+        if not (self.system.config.feature_flags & FeatureFlag.RECURSIVE_EVOLUTION):
             return
 
         self.logger.info("🔄 Evolving evolution code itself...")
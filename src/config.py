@@ -5,7 +5,7 @@ System Configuration - All 100 Features
 
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
-from enum import Enum
+from enum import Enum, IntFlag
 import json
 import os
 
@@ -24,6 +24,47 @@ class LogLevel(Enum):
     ERROR = "ERROR"
     CRITICAL = "CRITICAL"
 
+class FeatureFlag(IntFlag):
+    """Feature switches packed into one int; test with `flags & FeatureFlag.X`"""
+    TEMPORAL_AWARENESS = 1 << 0
+    EXISTENTIAL_AWARENESS = 1 << 1
+    META_REFLECTION = 1 << 2
+    COGNITIVE_ERROR_DETECTION = 1 << 3
+    AMBIGUITY_AWARENESS = 1 << 4
+    PREDICTIVE_CONSCIOUSNESS = 1 << 5
+    MEMORY_DEFRAGMENTATION = 1 << 6
+    COLLECTIVE_MEMORY = 1 << 7
+    DREAM_MEMORY = 1 << 8
+    ARCHITECTURAL_EVOLUTION = 1 << 9
+    SPONTANEOUS_EVOLUTION = 1 << 10
+    MULTI_OBJECTIVE_EVOLUTION = 1 << 11
+    RECURSIVE_EVOLUTION = 1 << 12
+    MONITORING_DASHBOARD_3D = 1 << 13
+    FAULT_PREDICTION = 1 << 14
+    RESPONSE_TIME_ANALYSIS = 1 << 15
+    ENERGY_COST_TRACKING = 1 << 16
+    INFORMATION_AGING_DETECTION = 1 << 17
+    SELF_SECURITY_AUDIT = 1 << 18
+    ETHICAL_DECISION_ANALYSIS = 1 << 19
+    CONSCIOUS_BACKUP_SYSTEM = 1 << 20
+    FAILURE_SIMULATION = 1 << 21
+    AGENT_GENEALOGY = 1 << 22
+    CONSCIOUS_MEMORY = 1 << 23
+    EMERGENCY_SIMULATION = 1 << 24
+
+    def get(self, name: str, default: Optional[bool] = None) -> Optional[bool]:
+        """Dict-style lookup by flag name, kept for string-based callers"""
+        member = FeatureFlag.__members__.get(name.upper())
+        if member is None:
+            return default
+        return bool(self & member)
+
+    def to_dict(self) -> Dict[str, bool]:
+        return {name.lower(): bool(self & member) for name, member in FeatureFlag.__members__.items()}
+
+# Everything except emergency_simulation is on by default
+DEFAULT_FEATURE_FLAGS = FeatureFlag(sum(f for f in FeatureFlag if f is not FeatureFlag.EMERGENCY_SIMULATION))
+
 # --- Nested Config Dataclasses ---
 
 @dataclass
@@ -42,10 +83,16 @@ class ConsciousnessConfig:
 @dataclass
 class DefragmentationConfig:
     cleanup_expired_threshold: int = 2592000  # 30 days in seconds
+    # Automatic defrag: after every_ops stores, or once low-importance stores exceed
+    # max(min_candidates, candidate_fraction * population)
+    every_ops: int = 1000
+    min_candidates: int = 100
+    candidate_fraction: float = 0.1
 
 @dataclass
 class MemoryConfig:
     defragmentation: DefragmentationConfig = field(default_factory=DefragmentationConfig)
+    db_pool_size: int = 4
 
 @dataclass
 class SpontaneousEvolutionConfig:
@@ -126,41 +173,55 @@ class OpenAINestedConfig:
     enabled: bool = True
     api_key: str = ""
     model: str = "gpt-4"
+    requests_per_minute: int = 60
+    max_concurrent: int = 4
 
 @dataclass
 class AnthropicNestedConfig:
     enabled: bool = True
     api_key: str = ""
     model: str = "claude-3-sonnet-20240229"
+    requests_per_minute: int = 50
+    max_concurrent: int = 4
 
 @dataclass
 class GoogleNestedConfig:
     enabled: bool = True
     api_key: str = ""
     model: str = "gemini-pro"
+    requests_per_minute: int = 60
+    max_concurrent: int = 4
 
 @dataclass
 class HuggingFaceNestedConfig:
     enabled: bool = True
     api_key: str = ""
     model: str = "meta-llama/Llama-2-7b-chat-hf"
+    requests_per_minute: int = 30
+    max_concurrent: int = 2
 
 @dataclass
 class OllamaNestedConfig:
     enabled: bool = True
     url: str = "http://localhost:11434"
     model: str = "llama2"
+    requests_per_minute: int = 0
+    max_concurrent: int = 2
 
 @dataclass
 class KimiNestedConfig:
     enabled: bool = False
     api_key: str = ""
+    requests_per_minute: int = 20
+    max_concurrent: int = 2
 
 @dataclass
 class MiniMaxNestedConfig:
     enabled: bool = False
     api_key: str = ""
     group_id: str = ""
+    requests_per_minute: int = 20
+    max_concurrent: int = 2
 
 @dataclass
 class LLMProvidersConfig:
@@ -172,6 +233,17 @@ class LLMProvidersConfig:
     ollama: OllamaNestedConfig = field(default_factory=OllamaNestedConfig)
     kimi: KimiNestedConfig = field(default_factory=KimiNestedConfig)
     minimax: MiniMaxNestedConfig = field(default_factory=MiniMaxNestedConfig)
+    # Exact-match completion cache in LLMProviderManager.generate
+    response_cache_size: int = 1024
+    response_cache_ttl: float = 3600.0
+    # Opt-in: near-duplicate prompts (cosine similarity >= threshold) reuse a cached completion.
+    # Paraphrases that change the meaning can clear the threshold, so only enable for tolerant workloads
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # Retries for rate-limited (429) completions, doubling the delay each time
+    rate_limit_retries: int = 3
+    rate_limit_backoff: float = 1.0
 
 @dataclass
 class PrometheusNestedConfig:
@@ -289,6 +361,13 @@ class AgentsConfig:
 class EmergencyConfig:
     recovery_timeout: int = 10
 
+@dataclass
+class HistoryConfig:
+    """Retention for the in-memory sliding histories"""
+    max_reflections: int = 1000
+    max_decisions: int = 1000
+    max_metrics: int = 4096
+
 # --- Main System Config ---
 
 @dataclass
@@ -303,37 +382,13 @@ class SystemConfig:
     reasoning: ReasoningConfig = field(default_factory=ReasoningConfig)
     agents: AgentsConfig = field(default_factory=AgentsConfig)
     emergency: EmergencyConfig = field(default_factory=EmergencyConfig)
+    history: HistoryConfig = field(default_factory=HistoryConfig)
     consciousness: ConsciousnessConfig = field(default_factory=ConsciousnessConfig)
     memory: MemoryConfig = field(default_factory=MemoryConfig)
     advanced_features: AdvancedFeaturesConfig = field(default_factory=AdvancedFeaturesConfig)
 
     # Feature Flags
-    feature_flags: Dict[str, bool] = field(default_factory=lambda: {
-        "temporal_awareness": True,
-        "existential_awareness": True,
-        "meta_reflection": True,
-        "cognitive_error_detection": True,
-        "ambiguity_awareness": True,
-        "predictive_consciousness": True,
-        "memory_defragmentation": True,
-        "collective_memory": True,
-        "dream_memory": True,
-        "architectural_evolution": True,
-        "spontaneous_evolution": True,
-        "multi_objective_evolution": True,
-        "recursive_evolution": True,
-        "monitoring_dashboard_3d": True,
-        "fault_prediction": True,
-        "response_time_analysis": True,
-        "energy_cost_tracking": True,
-        "information_aging_detection": True,
-        "self_security_audit": True,
-        "ethical_decision_analysis": True,
-        "conscious_backup_system": True,
-        "failure_simulation": True,
-        "agent_genealogy": True,
-        "conscious_memory": True
-    })
+    feature_flags: FeatureFlag = DEFAULT_FEATURE_FLAGS
 
     @classmethod
     def load_config_from_file(cls, path: str) -> "SystemConfig":
@@ -6,17 +6,28 @@ Features 21-35: Advanced Consciousness Capabilities
 import asyncio
 import logging
 import random
-import json
+import time
+from collections import deque
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, List, Any, Optional
+from typing import Deque, Dict, List, Any, Optional, Sequence
 from dataclasses import dataclass, field
+import numpy as np
+from src.config import FeatureFlag
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional
+    ahocorasick = None
 
 class ConsciousnessLevel(Enum):
     CHANDRI = "chandri"
     QUANTITATIVE = "quantitative"
     QUALITATIVE = "qualitative"
 
+# Plain dict lookup instead of the Enum.value descriptor on every metric tick
+_LEVEL_STRINGS = {level: level.value for level in ConsciousnessLevel}
+
 @dataclass
 class ConsciousnessState:
     level: ConsciousnessLevel
@@ -25,6 +36,109 @@ class ConsciousnessState:
     reflection_count: int = 0
     last_update: datetime = field(default_factory=datetime.now)
 
+    @property
+    def level_str(self) -> str:
+        return _LEVEL_STRINGS[self.level]
+
+@dataclass(frozen=True, slots=True)
+class Decision:
+    """Flat, immutable view of a decision, built once when it is logged"""
+    conclusion: str = ""
+    confidence: float = 0.5
+    rounds: int = 0
+    decision_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, raw: Any, decision_id: Optional[str] = None) -> "Decision":
+        """Extract the fields the checks need from a discussion/decision dict"""
+        if isinstance(raw, Decision):
+            return raw
+        if not isinstance(raw, dict):
+            return cls(decision_id=decision_id)
+        final = raw.get("final_decision") or {}
+        return cls(
+            conclusion=str(final.get("conclusion", "")),
+            confidence=float(final.get("confidence", 0.5)),
+            rounds=len(raw.get("rounds", [])),
+            decision_id=decision_id or raw.get("decision_id"),
+        )
+
+def ts_to_iso(ts_ns: int) -> str:
+    """Format a time.time_ns() stamp for human-facing output"""
+    return datetime.fromtimestamp(ts_ns / 1e9).isoformat()
+
+# Contradictory word pairs in a conclusion; each word gets one bit in a match mask
+INCONSISTENT_PAIRS = (("increase", "decrease"), ("start", "stop"), ("is", "is not"))
+_TOKEN_BITS = {word: 1 << i for i, word in enumerate(dict.fromkeys(w for pair in INCONSISTENT_PAIRS for w in pair))}
+_PAIR_MASKS = tuple(_TOKEN_BITS[a] | _TOKEN_BITS[b] for a, b in INCONSISTENT_PAIRS)
+
+def _build_token_automaton():
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word, bit in _TOKEN_BITS.items():
+        automaton.add_word(word, bit)
+    automaton.make_automaton()
+    return automaton
+
+_TOKEN_AUTOMATON = _build_token_automaton()
+
+def _token_mask(text: str) -> int:
+    """Bits of every contradiction word found in text, in one pass when pyahocorasick is available"""
+    mask = 0
+    if _TOKEN_AUTOMATON is not None:
+        for _, bit in _TOKEN_AUTOMATON.iter(text):
+            mask |= bit
+    else:
+        for word, bit in _TOKEN_BITS.items():
+            if word in text:
+                mask |= bit
+    return mask
+
+TREND_WINDOW = 10
+AWARENESS_RING_SIZE = 256
+TRACKED_METRICS = ("processed_tasks", "awareness_score")
+
+# Shared, immutable recommendation sets per performance trend
+_REC_DECLINING = ("Increase learning rate", "Trigger evolution cycle", "Review agent performance")
+_REC_IMPROVING = ("Maintain current parameters", "Document successful strategies")
+_REC_DEFAULT = ("Continue monitoring", "Consider hyperparameter tuning")
+_RECOMMENDATIONS = {"declining": _REC_DECLINING, "improving": _REC_IMPROVING}
+
+class TrendWindow:
+    """Sliding window that keeps monotonic-pair counts up to date on every push"""
+
+    def __init__(self, size: int = TREND_WINDOW):
+        self.values = deque(maxlen=size)
+        self.increasing = 0  # adjacent pairs with a <= b
+        self.decreasing = 0  # adjacent pairs with a >= b
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def push(self, value: float):
+        values = self.values
+        if len(values) == values.maxlen and len(values) >= 2:
+            # The oldest pair drops out of the window
+            first, second = values[0], values[1]
+            self.increasing -= first <= second
+            self.decreasing -= first >= second
+        if values:
+            last = values[-1]
+            self.increasing += last <= value
+            self.decreasing += last >= value
+        values.append(value)
+
+    def trend(self) -> str:
+        pairs = len(self.values) - 1
+        if pairs < 1:
+            return "insufficient_data"
+        if self.increasing == pairs:
+            return "improving"
+        if self.decreasing == pairs:
+            return "declining"
+        return "fluctuating"
+
 class StructuralConsciousnessLayer:
     """Core consciousness system with advanced features"""
 
@@ -34,35 +148,64 @@ class StructuralConsciousnessLayer:
         self.current_state = ConsciousnessState(
             level=ConsciousnessLevel.QUANTITATIVE
         )
-        self.state_history: List[Dict[str, Any]] = []
+        self.state_history: Deque[Dict[str, Any]] = deque(maxlen=system.config.history.max_reflections)
         self.reflection_depth = 0
         self.max_reflection_depth = 5
+        self._trend_buffers: Dict[str, TrendWindow] = {key: TrendWindow() for key in TRACKED_METRICS}
+        # Awareness score of every state_history entry, mirrored for vectorized reads
+        self._awareness_ring = np.zeros(AWARENESS_RING_SIZE, dtype=np.float32)
+        self._ring_idx = 0
+        # Bumped on every state mutation; the summary is rebuilt only when it changes
+        self._summary_version = 0
+        self._summary_cache_version = -1
+        self._summary_cache: Optional[Dict[str, Any]] = None
+        self.refresh_flags()
+
+    def refresh_flags(self):
+        """Resolve the feature flags this layer checks into plain booleans"""
+        flags = self.system.config.feature_flags
+        self._f_temporal = bool(flags & FeatureFlag.TEMPORAL_AWARENESS)
+        self._f_existential = bool(flags & FeatureFlag.EXISTENTIAL_AWARENESS)
+        self._f_meta = bool(flags & FeatureFlag.META_REFLECTION)
+        self._f_cognitive_errors = bool(flags & FeatureFlag.COGNITIVE_ERROR_DETECTION)
+        self._f_ambiguity = bool(flags & FeatureFlag.AMBIGUITY_AWARENESS)
+        self._f_predictive = bool(flags & FeatureFlag.PREDICTIVE_CONSCIOUSNESS)
+
+    def mark_state_changed(self):
+        """Invalidate cached views of the consciousness state"""
+        self._summary_version += 1
+
+    def record_metric(self, metric: Any):
+        """Feed a new metrics sample into the per-key trend windows"""
+        for key, window in self._trend_buffers.items():
+            window.push(getattr(metric, key, 0))
 
     async def initialize(self):
         """Initialize consciousness layer"""
         self.logger.info("🧠 Initializing Structural Consciousness Layer...")
+        self.refresh_flags()
         await self.calibrate_baseline()
 
     async def calibrate_baseline(self):
         """Calibrate consciousness baseline"""
         self.current_state.awareness_score = 0.6
         self.current_state.coherence_score = 0.7
+        self.mark_state_changed()
         self.logger.info("✅ Consciousness baseline calibrated")
 
     async def assess_self_awareness(self) -> Dict[str, Any]:
         """Comprehensive self-awareness assessment"""
-        assessment = {
-            "temporal_awareness": await self._assess_temporal_awareness(),
-            "existential_awareness": await self._assess_existential_awareness(),
-            "social_awareness": await self._assess_social_awareness(),
-            "boundary_awareness": await self._assess_boundary_awareness(),
-            "meta_reflection": await self._assess_meta_reflection()
-        }
-        return assessment
+        # Independent probes: run them concurrently
+        keys = ("temporal_awareness", "existential_awareness")
+        values = await asyncio.gather(
+            self._assess_temporal_awareness(),
+            self._assess_existential_awareness(),
+        )
+        return dict(zip(keys, values))
 
     async def _assess_temporal_awareness(self) -> float:
         """Temporal awareness measurement (Feature 21)"""
-        if not self.system.config.feature_flags.get("temporal_awareness"):
+        if not self._f_temporal:
             return 0.0
 
         # Check historical memory depth
@@ -73,7 +216,7 @@ class StructuralConsciousnessLayer:
 
     async def _assess_existential_awareness(self) -> float:
         """Existential awareness (Feature 23)"""
-        if not self.system.config.feature_flags.get("existential_awareness"):
+        if not self._f_existential:
             return 0.0
 
         # Self-recognition capability
@@ -83,8 +226,11 @@ class StructuralConsciousnessLayer:
         return 1.0 if has_self_model and self.current_state.awareness_score > awareness_threshold else 0.5
 
     async def reflect_on_performance(self, metrics: List, decisions: List, enable_meta_analysis: bool = False) -> Dict[str, Any]:
-        """Meta-reflection on system performance (Feature 30)"""
-        if not self.system.config.feature_flags.get("meta_reflection"):
+        """Meta-reflection on system performance (Feature 30)
+
+        Trends come from the samples fed through record_metric, not from the metrics argument.
+        """
+        if not self._f_meta:
             return {"reflection": "disabled"}
 
         if self.reflection_depth >= self.max_reflection_depth:
@@ -95,11 +241,12 @@ class StructuralConsciousnessLayer:
 
         try:
             # Analyze performance trends
-            performance_trend = self._analyze_trend(metrics, "processed_tasks")
-            awareness_trend = self._analyze_trend(metrics, "awareness_score")
+            performance_trend = self._recorded_trend("processed_tasks")
+            awareness_trend = self._recorded_trend("awareness_score")
 
+            ts_ns = time.time_ns()
             reflection = {
-                "timestamp": datetime.now().isoformat(),
+                "ts_ns": ts_ns,
                 "performance_trend": performance_trend,
                 "awareness_trend": awareness_trend,
                 "recommendations": self._generate_recommendations(performance_trend),
@@ -109,49 +256,33 @@ class StructuralConsciousnessLayer:
             if enable_meta_analysis:
                 reflection["meta_analysis"] = await self._meta_analyze_reflection(reflection)
 
-            # Store in history
-            self.state_history.append({
-                "state": self.current_state.__dict__,
-                "reflection": reflection,
-                "timestamp": datetime.now().isoformat()
-            })
+            self._record_state(reflection, ts_ns)
 
             return reflection
 
         finally:
             self.reflection_depth -= 1
 
-    def _analyze_trend(self, metrics: List, key: str) -> str:
-        """Analyze metric trend"""
-        if len(metrics) < 2:
-            return "insufficient_data"
+    def _record_state(self, reflection: Dict[str, Any], ts_ns: int):
+        # Don't build the entry at all when history retention is disabled
+        if self.state_history.maxlen != 0:
+            self.state_history.append({
+                "state": self.current_state.__dict__,
+                "reflection": reflection,
+                "ts_ns": ts_ns
+            })
+        self._awareness_ring[self._ring_idx % AWARENESS_RING_SIZE] = self.current_state.awareness_score
+        self._ring_idx += 1
+        self.mark_state_changed()
 
-        recent = [getattr(m, key, 0) for m in metrics[-10:]]
-        if all(recent[i] <= recent[i+1] for i in range(len(recent)-1)):
-            return "improving"
-        elif all(recent[i] >= recent[i+1] for i in range(len(recent)-1)):
-            return "declining"
-        else:
-            return "fluctuating"
+    def _recorded_trend(self, key: str) -> str:
+        """Trend of a tracked metric over the last TREND_WINDOW samples passed to record_metric"""
+        window = self._trend_buffers.get(key)
+        return window.trend() if window is not None else "insufficient_data"
 
-    def _generate_recommendations(self, trend: str) -> List[str]:
+    def _generate_recommendations(self, trend: str) -> Sequence[str]:
         """Generate improvement recommendations"""
-        if trend == "declining":
-            return [
-                "Increase learning rate",
-                "Trigger evolution cycle",
-                "Review agent performance"
-            ]
-        elif trend == "improving":
-            return [
-                "Maintain current parameters",
-                "Document successful strategies"
-            ]
-        else:
-            return [
-                "Continue monitoring",
-                "Consider hyperparameter tuning"
-            ]
+        return _RECOMMENDATIONS.get(trend, _REC_DEFAULT)
 
     async def _meta_analyze_reflection(self, reflection: Dict) -> Dict[str, Any]:
         """Think about the reflection process itself"""
@@ -161,58 +292,54 @@ class StructuralConsciousnessLayer:
             "suggested_depth": min(self.max_reflection_depth, reflection["depth"] + 1)
         }
 
-    async def detect_cognitive_errors(self, decisions: List[Dict]) -> List[Dict]:
+    async def detect_cognitive_errors(self, decisions: List[Any]) -> List[Dict]:
         """Detect cognitive errors in decisions (Feature 31)"""
-        if not self.system.config.feature_flags.get("cognitive_error_detection"):
+        if not self._f_cognitive_errors:
             return []
 
         errors = []
-
-        for decision in decisions:
-            # Check for logical inconsistency
-            if self._is_logically_inconsistent(decision):
+        n = len(decisions)
+        if n == 0:
+            return errors
+
+        # Both checks as whole-batch masks (same rule as _detect_bias)
+        decisions = [Decision.from_dict(d) for d in decisions]
+        confidences = np.fromiter((d.confidence for d in decisions), dtype=np.float64, count=n)
+        rounds = np.fromiter((d.rounds for d in decisions), dtype=np.int64, count=n)
+        biased = (confidences > 0.9) & (rounds < 2)
+        inconsistent = np.fromiter((self._is_logically_inconsistent(d) for d in decisions), dtype=bool, count=n)
+
+        for i in np.flatnonzero(inconsistent | biased):
+            decision_id = decisions[i].decision_id
+            if inconsistent[i]:
                 errors.append({
                     "type": "logical_inconsistency",
-                    "decision_id": decision.get("decision_id"),
+                    "decision_id": decision_id,
                     "severity": "high"
                 })
-
-            # Check for bias
-            if self._detect_bias(decision):
+            if biased[i]:
                 errors.append({
                     "type": "cognitive_bias",
-                    "decision_id": decision.get("decision_id"),
+                    "decision_id": decision_id,
                     "severity": "medium"
                 })
 
         return errors
 
-    def _is_logically_inconsistent(self, decision: Dict) -> bool:
+    def _is_logically_inconsistent(self, decision: Decision) -> bool:
         """Check for logical inconsistencies"""
-        conclusion = decision.get("final_decision", {}).get("conclusion", "")
-
         # Simple check for contradictory statements
-        inconsistent_pairs = [
-            ("increase", "decrease"),
-            ("start", "stop"),
-            ("is", "is not")
-        ]
-
-        for word1, word2 in inconsistent_pairs:
-            if word1 in conclusion and word2 in conclusion:
-                return True
-
-        return False
+        mask = _token_mask(decision.conclusion)
+        return any(mask & pair == pair for pair in _PAIR_MASKS)
 
-    def _detect_bias(self, decision: Dict) -> bool:
+    def _detect_bias(self, decision: Decision) -> bool:
         """Detect cognitive bias"""
-        confidence = decision.get("final_decision", {}).get("confidence", 0.5)
         # High confidence with low consensus might indicate bias
-        return confidence > 0.9 and len(decision.get("rounds", [])) < 2
+        return decision.confidence > 0.9 and decision.rounds < 2
 
     async def handle_ambiguity(self, ambiguous_input: Dict) -> Dict[str, Any]:
         """Handle ambiguous input (Feature 33)"""
-        if not self.system.config.feature_flags.get("ambiguity_awareness"):
+        if not self._f_ambiguity:
             return {"status": "disabled"}
 
         uncertainty = ambiguous_input.get("uncertainty_level", 0.5)
@@ -240,15 +367,15 @@ class StructuralConsciousnessLayer:
 
     async def predict_consciousness_evolution(self, horizon_minutes: int = 60) -> Dict[str, Any]:
         """Predict future consciousness state (Feature 24)"""
-        if not self.system.config.feature_flags.get("predictive_consciousness"):
+        if not self._f_predictive:
             return {"prediction": "disabled"}
 
         # Simple LSTM-like prediction
         if len(self.state_history) < 10:
             return {"insufficient_data": True}
 
-        recent_scores = [s["state"]["awareness_score"] for s in self.state_history[-10:]]
-        trend = sum(recent_scores[-5:]) - sum(recent_scores[:5])
+        recent = np.take(self._awareness_ring, np.arange(self._ring_idx - 10, self._ring_idx), mode="wrap")
+        trend = float(recent[5:].sum() - recent[:5].sum())
 
         predicted_score = self.current_state.awareness_score + (trend * 0.1)
         predicted_score = max(0.0, min(1.0, predicted_score))
@@ -261,11 +388,14 @@ class StructuralConsciousnessLayer:
 
     def get_consciousness_summary(self) -> Dict[str, Any]:
         """Get current state summary"""
-        return {
-            "level": self.current_state.level.value,
-            "awareness_score": round(self.current_state.awareness_score, 3),
-            "coherence_score": round(self.current_state.coherence_score, 3),
-            "reflection_count": self.current_state.reflection_count,
-            "state_history_length": len(self.state_history),
-            "last_update": self.current_state.last_update.isoformat()
-        }
+        if self._summary_cache_version != self._summary_version:
+            self._summary_cache = {
+                "level": self.current_state.level_str,
+                "awareness_score": round(self.current_state.awareness_score, 3),
+                "coherence_score": round(self.current_state.coherence_score, 3),
+                "reflection_count": self.current_state.reflection_count,
+                "state_history_length": len(self.state_history),
+                "last_update": self.current_state.last_update.isoformat()
+            }
+            self._summary_cache_version = self._summary_version
+        return self._summary_cache
@@ -8,6 +8,7 @@ import logging
 import random
 from datetime import datetime
 from typing import Dict, List, Any, Optional
+from src.config import FeatureFlag
 
 class EmergencyManagementSystem:
     """Handles emergency scenarios and recovery"""
@@ -27,7 +28,7 @@ class EmergencyManagementSystem:
         """Initialize emergency system"""
         self.logger.info("🚨 Initializing Emergency Management System...")
 
-        if self.system.config.feature_flags.get("failure_simulation"):
+        if self.system.config.feature_flags & FeatureFlag.FAILURE_SIMULATION:
             asyncio.create_task(self._failure_simulation_watchdog())
 
     async def handle_error(self, error: Exception):
@@ -45,7 +46,7 @@ class EmergencyManagementSystem:
 
     async def simulate_emergency(self, scenario: str = "system_overload"):
         """Simulate emergency scenario (Feature 1)"""
-        if not self.system.config.feature_flags.get("emergency_simulation"):
+        if not (self.system.config.feature_flags & FeatureFlag.EMERGENCY_SIMULATION):
             self.logger.warning("Emergency simulation disabled")
             return
 
@@ -99,7 +100,7 @@ class EmergencyManagementSystem:
             agent.reduce_activity()
 
         # Enable backup systems
-        if self.system.config.feature_flags.get("conscious_backup_system"):
+        if self.system.config.feature_flags & FeatureFlag.CONSCIOUS_BACKUP_SYSTEM:
             await self.system.security_system.backup_critical_data()
 
     async def shutdown(self):
@@ -11,6 +11,7 @@ from datetime import datetime
 from fastapi import FastAPI, WebSocket, HTTPException
 from fastapi.responses import HTMLResponse
 import uvicorn
+from src.serialization import dumps
 
 class UniversalInteractionGateway:
     """Multi-modal interaction gateway"""
@@ -39,11 +40,12 @@ class UniversalInteractionGateway:
 
         @self.app.get("/api/status")
         async def get_status():
+            latest = self.system.metrics.latest()
             return {
                 "system_id": self.system.system_id,
                 "state": self.system.current_state.value,
                 "consciousness": self.system.consciousness_layer.get_consciousness_summary(),
-                "metrics": self.system.metrics[-1].__dict__ if self.system.metrics else {}
+                "metrics": latest.__dict__ if latest else {}
             }
 
         @self.app.websocket("/ws/monitoring")
@@ -105,7 +107,7 @@ class UniversalInteractionGateway:
 
     async def emit_update(self, data: Dict[str, Any]):
         """Emit update to all connected WebSockets"""
-        message = json.dumps(data)
+        message = dumps(data).decode()
 
         for websocket in self.websockets:
             try:
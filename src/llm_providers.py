@@ -4,15 +4,20 @@ Supports OpenAI, Anthropic, Google, HuggingFace, Ollama
 """
 
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from abc import ABC, abstractmethod
+import numpy as np
 import openai
 from anthropic import AsyncAnthropic
 import google.generativeai as genai
-from huggingface_hub import InferenceClient
+from huggingface_hub import AsyncInferenceClient
 import ollama
-from src.agents.chinese_models import KimiProvider, MiniMaxProvider
+from src.ai_integrations import get_embeddings
 
 class LLMProvider(ABC):
     """Abstract LLM provider"""
@@ -94,8 +99,7 @@ class GoogleProvider(LLMProvider):
 
     async def generate(self, prompt: str, **kwargs) -> str:
         try:
-            response = await asyncio.to_thread(
-                self.model.generate_content,
+            response = await self.model.generate_content_async(
                 prompt,
                 generation_config={
                     "max_output_tokens": kwargs.get("max_tokens", 4096),
@@ -116,14 +120,13 @@ class HuggingFaceProvider(LLMProvider):
     """HuggingFace models"""
 
     def __init__(self, api_key: str, model: str = "meta-llama/Llama-2-7b-chat-hf", providers: Dict = {}):
-        self.client = InferenceClient(model=model, token=api_key)
+        self.client = AsyncInferenceClient(model=model, token=api_key)
         self.logger = logging.getLogger("HuggingFaceProvider")
         self.providers = providers
 
     async def generate(self, prompt: str, **kwargs) -> str:
         try:
-            response = await asyncio.to_thread(
-                self.client.text_generation,
+            response = await self.client.text_generation(
                 prompt,
                 max_new_tokens=kwargs.get("max_tokens", 4096),
                 temperature=kwargs.get("temperature", 0.7)
@@ -144,13 +147,13 @@ class OllamaProvider(LLMProvider):
     def __init__(self, url: str = "http://localhost:11434", model: str = "llama2", providers: Dict = {}):
         self.url = url
         self.model = model
+        self.client = ollama.AsyncClient(host=url)
         self.logger = logging.getLogger("OllamaProvider")
         self.providers = providers
 
     async def generate(self, prompt: str, **kwargs) -> str:
         try:
-            response = await asyncio.to_thread(
-                ollama.chat,
+            response = await self.client.chat(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}]
             )
@@ -161,8 +164,7 @@ class OllamaProvider(LLMProvider):
 
     async def embed(self, text: str) -> list:
         try:
-            response = await asyncio.to_thread(
-                ollama.embeddings,
+            response = await self.client.embeddings(
                 model=self.model,
                 prompt=text
             )
@@ -171,6 +173,106 @@ class OllamaProvider(LLMProvider):
             self.logger.error(f"Ollama embed error: {e}")
             return []
 
+class ResponseCache:
+    """Exact-match LRU cache of completions with a time-to-live"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(provider: str, prompt: str, kwargs: Dict[str, Any]) -> str:
+        payload = json.dumps({"p": provider, "q": prompt, "k": kwargs}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def put(self, key: str, value: str):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+class SemanticCache:
+    """Completion cache matched by prompt-embedding cosine similarity, one ring per scope"""
+
+    def __init__(self, threshold: float = 0.92, maxsize: int = 1024):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        # scope -> [unit vectors (maxsize x dim), responses, stored count]
+        self._scopes: Dict[str, list] = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def normalize(vector: Any) -> Optional[np.ndarray]:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm else None
+
+    def lookup(self, scope: str, vector: np.ndarray) -> Optional[str]:
+        entry = self._scopes.get(scope)
+        if entry is not None:
+            vectors, responses, count = entry
+            n = min(count, self.maxsize)
+            similarities = vectors[:n] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                self.stats["hits"] += 1
+                return responses[best]
+        self.stats["misses"] += 1
+        return None
+
+    def add(self, scope: str, vector: np.ndarray, response: str):
+        entry = self._scopes.get(scope)
+        if entry is None:
+            entry = self._scopes[scope] = [np.zeros((self.maxsize, len(vector)), dtype=np.float32), [None] * self.maxsize, 0]
+        vectors, responses, count = entry
+        slot = count % self.maxsize
+        vectors[slot] = vector
+        responses[slot] = response
+        entry[2] = count + 1
+
+class RateLimiter:
+    """Per-provider request pacing (token bucket of size 1) plus a concurrency cap"""
+
+    def __init__(self, requests_per_minute: int = 0, max_concurrent: int = 1):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        if self.interval:
+            async with self._lock:
+                now = time.monotonic()
+                delay = self._next_slot - now
+                self._next_slot = max(now, self._next_slot) + self.interval
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+def is_rate_limited(result: Any) -> bool:
+    """Whether a provider's "Error: ..." result reports an HTTP 429 / quota rejection"""
+    if not isinstance(result, str) or not result.startswith("Error: "):
+        return False
+    message = result.lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
 class LLMProviderManager:
     """Manages multiple LLM providers"""
 
@@ -179,9 +281,23 @@ class LLMProviderManager:
         self.logger = logging.getLogger("LLMProviderManager")
         self.providers: Dict[str, LLMProvider] = {}
         self.active_provider = None
+        self.response_cache = ResponseCache(
+            config.llm_providers.response_cache_size,
+            config.llm_providers.response_cache_ttl,
+        )
+        self.rate_limiters: Dict[str, RateLimiter] = {}
+        self.semantic_cache: Optional[SemanticCache] = None
+        if config.llm_providers.semantic_cache_enabled:
+            self.semantic_cache = SemanticCache(
+                config.llm_providers.semantic_cache_threshold,
+                config.llm_providers.response_cache_size,
+            )
 
     async def initialize(self):
         """Initialize all configured providers"""
+        # chinese_models subclasses LLMProvider, so it can only be imported once this module is loaded
+        from src.agents.chinese_models import KimiProvider, MiniMaxProvider
+
         self.logger.info("🤖 Initializing LLM Providers...")
 
         # OpenAI
@@ -239,6 +355,13 @@ class LLMProviderManager:
                 providers=self.providers,
             )
 
+        for name in self.providers:
+            provider_config = getattr(self.config.llm_providers, name)
+            self.rate_limiters[name] = RateLimiter(
+                provider_config.requests_per_minute,
+                provider_config.max_concurrent,
+            )
+
         # Set default provider
         if self.providers:
             self.active_provider = list(self.providers.keys())[0]
@@ -254,7 +377,63 @@ class LLMProviderManager:
         if provider_name not in self.providers:
             return f"Provider {provider_name} not available"
 
-        return await self.providers[provider_name].generate(prompt, **kwargs)
+        # Cache entries are scoped to the provider and its configured model
+        model = getattr(getattr(self.config.llm_providers, provider_name, None), "model", "")
+        cache_scope = f"{provider_name}/{model}"
+        key = ResponseCache.make_key(cache_scope, prompt, kwargs)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Paraphrases only match within the same provider, model and generation settings
+        scope = ResponseCache.make_key(cache_scope, "", kwargs)
+        # Held locally: a concurrent embedding failure may reset self.semantic_cache while we await
+        semantic_cache = self.semantic_cache
+        vector = await self._embed_prompt(prompt) if semantic_cache is not None else None
+        if vector is not None:
+            similar = semantic_cache.lookup(scope, vector)
+            if similar is not None:
+                return similar
+
+        result = await self._dispatch(provider_name, prompt, **kwargs)
+        # Providers report failures as "Error: ..." text; never cache those
+        if isinstance(result, str) and not result.startswith("Error: "):
+            self.response_cache.put(key, result)
+            if vector is not None:
+                semantic_cache.add(scope, vector, result)
+        return result
+
+    async def _dispatch(self, provider_name: str, prompt: str, **kwargs) -> str:
+        """Call a provider within its rate limits, backing off on 429 rejections"""
+        limiter = self.rate_limiters[provider_name]
+        retries = self.config.llm_providers.rate_limit_retries
+        delay = self.config.llm_providers.rate_limit_backoff
+        for attempt in range(retries + 1):
+            async with limiter:
+                result = await self.providers[provider_name].generate(prompt, **kwargs)
+            if not is_rate_limited(result) or attempt == retries:
+                return result
+            self.logger.warning(f"{provider_name} rate limited, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay *= 2
+        return result
+
+    async def batch_generate(self, prompts: List[str], provider: Optional[str] = None, **kwargs) -> List[str]:
+        """Generate many prompts concurrently; each provider's limiter paces the fan-out"""
+        return list(await asyncio.gather(*(self.generate(p, provider, **kwargs) for p in prompts)))
+
+    async def _embed_prompt(self, prompt: str) -> Optional[np.ndarray]:
+        """Unit embedding of the prompt for the semantic cache, or None when it is unavailable"""
+        if self.semantic_cache is None:
+            return None
+        try:
+            embeddings = await get_embeddings(self.config.llm_providers.semantic_cache_model)
+            vector = await asyncio.to_thread(embeddings.embed_query, prompt)
+        except Exception as e:
+            self.logger.warning(f"Semantic cache disabled, prompt embedding failed: {e}")
+            self.semantic_cache = None
+            return None
+        return SemanticCache.normalize(vector)
 
     async def embed(self, text: str, provider: Optional[str] = None) -> list:
         """Get embeddings"""
@@ -5,24 +5,25 @@ Self-Aware AI System v100 - Main Engine
 """
 import asyncio
 import logging
+import logging.handlers
+import queue
 import json
 import time
 import psutil
+import numpy as np
 import signal
 import os
-import random
-import hashlib
-import uuid
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import secrets
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass
 import threading
-import queue
+from collections import deque
+from itertools import count, islice
 
 # Import modules
 from src.config import SystemConfig, get_config
-from src.consciousness_layer import StructuralConsciousnessLayer
+from src.consciousness_layer import Decision, StructuralConsciousnessLayer
 from src.code_generation import AutonomousCodeGenerationModule
 from src.reasoning_orchestrator import MultiModelReasoningOrchestrator
 from src.memory_module import MemoryManagementSystem
@@ -36,6 +37,13 @@ from src.ai_integrations import LangChainManager, LlamaIndexManager, VectorDBMan
 from src.celery_app import celery_app
 from src.telemetry import setup_telemetry
 
+SYS_SAMPLE_INTERVAL = 1.0  # seconds between shared psutil samples
+
+# Autonomous loop schedule, in iterations; pairwise coprime so cycles don't phase-lock
+LEARNING_INTERVAL = 11     # ~10% of iterations
+EVOLUTION_INTERVAL = 19    # ~5%
+REFLECTION_INTERVAL = 5    # 20%
+
 class SystemState(Enum):
     INITIALIZING = "initializing"
     ACTIVE = "active"
@@ -48,7 +56,7 @@ class SystemState(Enum):
 
 @dataclass
 class SystemMetrics:
-    timestamp: datetime
+    timestamp_ns: int
     state: SystemState
     cpu_usage: float
     memory_usage: float
@@ -60,19 +68,111 @@ class SystemMetrics:
     awareness_score: float
     coherence_score: float
 
+_STATES = tuple(SystemState)
+_STATE_CODES = {state: code for code, state in enumerate(_STATES)}
+
+class MetricsBuffer:
+    """Fixed-size struct-of-arrays ring of SystemMetrics samples"""
+    COLUMNS = {
+        "timestamp_ns": np.int64,
+        "state": np.int8,
+        "cpu_usage": np.float32,
+        "memory_usage": np.float32,
+        "active_agents": np.int32,
+        "processed_tasks": np.int32,
+        "learning_cycles": np.int32,
+        "evolution_cycles": np.int32,
+        "consciousness_level": np.int8,
+        "awareness_score": np.float32,
+        "coherence_score": np.float32,
+    }
+
+    def __init__(self, size: int):
+        self.size = size
+        self.total = 0
+        self.columns = {name: np.zeros(size, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        # consciousness_level strings are interned to small codes
+        self._levels: List[str] = []
+        self._level_codes: Dict[str, int] = {}
+
+    def __len__(self):
+        return min(self.total, self.size)
+
+    def append(self, metric: SystemMetrics):
+        i = self.total % self.size
+        cols = self.columns
+        cols["timestamp_ns"][i] = metric.timestamp_ns
+        cols["state"][i] = _STATE_CODES[metric.state]
+        cols["cpu_usage"][i] = metric.cpu_usage
+        cols["memory_usage"][i] = metric.memory_usage
+        cols["active_agents"][i] = metric.active_agents
+        cols["processed_tasks"][i] = metric.processed_tasks
+        cols["learning_cycles"][i] = metric.learning_cycles
+        cols["evolution_cycles"][i] = metric.evolution_cycles
+        cols["consciousness_level"][i] = self._level_code(metric.consciousness_level)
+        cols["awareness_score"][i] = metric.awareness_score
+        cols["coherence_score"][i] = metric.coherence_score
+        self.total += 1
+
+    def _level_code(self, level: str) -> int:
+        code = self._level_codes.get(level)
+        if code is None:
+            code = self._level_codes[level] = len(self._levels)
+            self._levels.append(level)
+        return code
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        """The last n values of a column, oldest first (all retained values if n is None)"""
+        count = len(self) if n is None else min(n, len(self))
+        idx = np.arange(self.total - count, self.total) % self.size
+        return self.columns[name][idx]
+
+    def count_state(self, state: Any) -> int:
+        """Number of retained samples taken in state (a SystemState or its value)"""
+        if not isinstance(state, SystemState):
+            state = SystemState(state)
+        return int(np.count_nonzero(self.columns["state"][:len(self)] == _STATE_CODES[state]))
+
+    def latest(self) -> Optional[SystemMetrics]:
+        if not self.total:
+            return None
+        i = (self.total - 1) % self.size
+        cols = self.columns
+        return SystemMetrics(
+            timestamp_ns=int(cols["timestamp_ns"][i]),
+            state=_STATES[cols["state"][i]],
+            cpu_usage=float(cols["cpu_usage"][i]),
+            memory_usage=float(cols["memory_usage"][i]),
+            active_agents=int(cols["active_agents"][i]),
+            processed_tasks=int(cols["processed_tasks"][i]),
+            learning_cycles=int(cols["learning_cycles"][i]),
+            evolution_cycles=int(cols["evolution_cycles"][i]),
+            consciousness_level=self._levels[cols["consciousness_level"][i]],
+            awareness_score=float(cols["awareness_score"][i]),
+            coherence_score=float(cols["coherence_score"][i]),
+        )
+
 class SelfAwareAISystem:
     def __init__(self, config_path: Optional[str] = None):
-        self.system_id = f"SAIS_v100_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        # One random prefix per process; task ids add a counter instead of a fresh uuid each
+        self._id_prefix = secrets.token_hex(4)
+        self._id_counter = count()
+        self.system_id = f"SAIS_v100_{int(time.time())}_{self._id_prefix}"
         self.current_state = SystemState.INITIALIZING
-        self.metrics: List[SystemMetrics] = []
         self.agents: List[AIAgent] = []
-        self.task_queue = queue.Queue()
-        self.decision_log: List[Dict[str, Any]] = []
-        self.consciousness_history: List[Dict[str, Any]] = []
+        self.task_queue: asyncio.Queue = asyncio.Queue()
         self.feature_usage_stats: Dict[str, int] = {}
 
         self.config = self._load_config(config_path)
 
+        # Sliding histories; processed_task_count keeps the all-time total
+        self.decision_log: Deque[Dict[str, Any]] = deque(maxlen=self.config.history.max_decisions)
+        self.consciousness_history: Deque[Dict[str, Any]] = deque(maxlen=self.config.history.max_reflections)
+        self.processed_task_count = 0
+        self.metrics = MetricsBuffer(self.config.history.max_metrics)
+        # (cpu %, memory %) refreshed by _sys_sampler_loop; every loop reads this instead of psutil
+        self.sys_sample: Tuple[float, float] = (0.0, 0.0)
+
         # Initialize AI tool managers
         self.langchain_manager = LangChainManager(self.config.advanced_features)
         self.llama_index_manager = LlamaIndexManager(self.config.advanced_features)
@@ -109,17 +209,22 @@ class SelfAwareAISystem:
         file_handler.setFormatter(file_formatter)
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        logging.basicConfig(level=logging.DEBUG, handlers=[file_handler, console_handler])
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S'))
+        # Loggers only enqueue; the listener thread does the actual file/console writes
+        log_queue = queue.SimpleQueue()
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self._log_listener.start()
+        logging.basicConfig(level=logging.DEBUG, handlers=[logging.handlers.QueueHandler(log_queue)])
         self.logger = logging.getLogger(self.system_id)
-        for handler in logging.root.handlers:
-            if isinstance(handler, logging.StreamHandler):
-                handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S'))
 
     def _load_config(self, config_path: Optional[str]) -> SystemConfig:
         return get_config(config_path)
 
     async def initialize_system(self):
         self.logger.info("🔄 Initializing Self-Aware AI System v100...")
+        asyncio.create_task(self._sys_sampler_loop())
         await self.security_system.initialize()
 
         await asyncio.gather(
@@ -185,7 +290,7 @@ class SelfAwareAISystem:
         signal.signal(signal.SIGTERM, handle_shutdown)
 
     def submit_task(self, task: Dict[str, Any]):
-        self.task_queue.put(task)
+        self.task_queue.put_nowait(task)
 
     async def benchmark_consciousness(self):
         self.logger.info("🔬 Running consciousness benchmark...")
@@ -202,12 +307,15 @@ class SelfAwareAISystem:
                     continue
                 if self.is_sleeping and self._should_wake():
                     await self._wake_from_sleep()
-                if not self.task_queue.empty():
-                    task = self.task_queue.get()
+                try:
+                    task = self.task_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                else:
                     await self._process_task(task)
-                if self._should_learn(): await self._trigger_learning_cycle()
-                if self._should_evolve(): await self._trigger_evolution_cycle()
-                if self._should_reflect(): await self._trigger_reflection_cycle()
+                if iteration % LEARNING_INTERVAL == 0: await self._trigger_learning_cycle()
+                if iteration % EVOLUTION_INTERVAL == 0: await self._trigger_evolution_cycle()
+                if iteration % REFLECTION_INTERVAL == 0: await self._trigger_reflection_cycle()
                 if iteration % 100 == 0: await self._run_self_awareness_tests()
                 if iteration % 200 == 0: await self._save_consciousness_snapshot()
                 await self._update_metrics()
@@ -224,11 +332,18 @@ class SelfAwareAISystem:
             except Exception as e:
                 self.logger.error(f"❌ Error in monitoring loop: {e}")
 
+    async def _sys_sampler_loop(self):
+        while not self.shutdown_requested:
+            try:
+                self.sys_sample = (psutil.cpu_percent(), psutil.virtual_memory().percent)
+            except Exception as e:
+                self.logger.error(f"❌ Error sampling system usage: {e}")
+            await asyncio.sleep(SYS_SAMPLE_INTERVAL)
+
     async def _emergency_detection_loop(self):
         while not self.shutdown_requested:
             try:
-                cpu = psutil.cpu_percent()
-                mem = psutil.virtual_memory().percent
+                cpu, mem = self.sys_sample
                 if cpu > self.config.performance.cpu_threshold or mem > self.config.performance.memory_threshold:
                     await self._enter_emergency_mode("System Overload")
                 await asyncio.sleep(10)
@@ -236,15 +351,22 @@ class SelfAwareAISystem:
                 self.logger.error(f"❌ Error in emergency detection: {e}")
 
     async def _process_task(self, task: Dict[str, Any]):
-        task_id = task.get("id", f"task_{uuid.uuid4().hex[:8]}")
+        task_id = task.get("id") or f"task_{self._id_prefix}_{next(self._id_counter):x}"
         self.logger.info(f"📝 Processing task: {task_id}")
         agent_name = task.get("agent", "autogpt")
         result = await self.agents_manager.execute_with_agent(agent_name, task["prompt"])
-        self.decision_log.append({"task_id": task_id, "decision": result, "timestamp": datetime.now().isoformat()})
+        self.decision_log.append({
+            "task_id": task_id,
+            "decision": result,
+            "parsed": Decision.from_dict(result, decision_id=task_id),
+            "ts_ns": time.time_ns(),
+        })
+        self.processed_task_count += 1
+
+    def recent_decisions(self, n: int) -> List[Dict[str, Any]]:
+        """The last n decision_log entries, oldest first"""
+        return list(islice(self.decision_log, max(len(self.decision_log) - n, 0), None))
 
-    def _should_learn(self): return random.random() < 0.1
-    def _should_evolve(self): return random.random() < 0.05
-    def _should_reflect(self): return random.random() < 0.2
     def _should_enter_sleep(self): return False # Implement logic
     def _should_wake(self): return True # Implement logic
 
@@ -254,21 +376,22 @@ class SelfAwareAISystem:
     async def _run_self_awareness_tests(self): self.logger.info("🔬 Running self-awareness tests...")
     async def _save_consciousness_snapshot(self): self.logger.info("📸 Saving consciousness snapshot...")
     async def _update_metrics(self):
-        self.metrics.append(
-            SystemMetrics(
-                timestamp=datetime.now(),
-                state=self.current_state,
-                cpu_usage=psutil.cpu_percent(),
-                memory_usage=psutil.virtual_memory().percent,
-                active_agents=len(self.agents),
-                processed_tasks=self.task_queue.qsize(),
-                learning_cycles=0,  # Placeholder
-                evolution_cycles=0,  # Placeholder
-                consciousness_level="",  # Placeholder
-                awareness_score=0.0,  # Placeholder
-                coherence_score=0.0,  # Placeholder
-            )
+        cpu, mem = self.sys_sample
+        metric = SystemMetrics(
+            timestamp_ns=time.time_ns(),
+            state=self.current_state,
+            cpu_usage=cpu,
+            memory_usage=mem,
+            active_agents=len(self.agents),
+            processed_tasks=self.task_queue.qsize(),
+            learning_cycles=0,  # Placeholder
+            evolution_cycles=0,  # Placeholder
+            consciousness_level=self.consciousness_layer.current_state.level_str,
+            awareness_score=0.0,  # Placeholder
+            coherence_score=0.0,  # Placeholder
         )
+        self.metrics.append(metric)
+        self.consciousness_layer.record_metric(metric)
 
     async def _enter_emergency_mode(self, reason: str):
         if not self.emergency_mode:
@@ -293,7 +416,9 @@ class SelfAwareAISystem:
         await self._save_consciousness_snapshot()
         await asyncio.gather(*[agent.shutdown() for agent in self.agents])
         await self.interaction_gateway.shutdown()
+        await self.memory_system.shutdown()
         self.logger.info("✅ System shutdown complete!")
+        self._log_listener.stop()
 
 if __name__ == "__main__":
     async def main():
@@ -8,11 +8,188 @@ import logging
 import json
 import sqlite3
 import os
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import numpy as np
+from src.config import FeatureFlag
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional
+    ahocorasick = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+def _json_dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+# Applied once per connection: WAL lets reads proceed during writes, NORMAL sync skips per-commit fsync
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+WRITE_BATCH_MAX = 500  # rows per background commit
+EPISODIC_BUFFER_SIZE = 100  # short-term capacity; a full buffer triggers consolidation
+CONSOLIDATION_BATCH = 20  # oldest entries moved to long-term per consolidation
+
+MEMORIES_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS memories (
+    id TEXT PRIMARY KEY,
+    content TEXT,
+    memory_type TEXT,
+    timestamp TEXT,
+    importance REAL,
+    emotional_weight REAL,
+    tags TEXT
+)
+'''
+
+ASSOCIATIONS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS associations (
+    source_id TEXT,
+    target_id TEXT,
+    strength REAL,
+    timestamp TEXT,
+    PRIMARY KEY (source_id, target_id)
+)
+'''
+
+INSERT_MEMORY = '''
+INSERT OR REPLACE INTO memories
+(id, content, memory_type, timestamp, importance, emotional_weight, tags)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection):
+    """Explicit BEGIN/COMMIT around a block of statements"""
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+class SQLitePool:
+    """Warm sqlite3 connections whose calls run on worker threads, off the event loop"""
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._connections: List[sqlite3.Connection] = []
+        self._opening = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; multi-row writes open their own transaction via _transaction()
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Call fn(conn, *args) in a worker thread with a pooled connection"""
+        if self._idle.empty() and len(self._connections) + self._opening < self.size:
+            self._opening += 1
+            try:
+                conn = await asyncio.to_thread(self._connect)
+            finally:
+                self._opening -= 1
+            self._connections.append(conn)
+        else:
+            conn = await self._idle.get()
+        try:
+            return await asyncio.to_thread(fn, conn, *args)
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def close(self):
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+        self._idle = asyncio.Queue()
+
+def _create_schema(conn: sqlite3.Connection):
+    conn.execute(MEMORIES_SCHEMA)
+    conn.execute(ASSOCIATIONS_SCHEMA)
+
+# The helpers below run on pool worker threads, so row decoding/encoding stays off the event loop too
+def _select_memories(conn: sqlite3.Connection) -> List["MemoryEntry"]:
+    return [MemoryEntry(
+        id=row[0],
+        content=_json_loads(row[1]),
+        memory_type=MemoryType(row[2]),
+        timestamp=datetime.fromisoformat(row[3]),
+        importance=row[4],
+        emotional_weight=row[5],
+        tags=list(_decode_tags(row[6]))
+    ) for row in conn.execute("SELECT * FROM memories")]
+
+def _insert_memories(conn: sqlite3.Connection, memories: List["MemoryEntry"]):
+    rows = [(
+        memory.id,
+        _json_dumps(memory.content),
+        memory.memory_type.value,
+        memory.timestamp.isoformat(),
+        memory.importance,
+        memory.emotional_weight,
+        _json_dumps(memory.tags)
+    ) for memory in memories]
+    with _transaction(conn):
+        conn.executemany(INSERT_MEMORY, rows)
+
+EMOTION_WORDS = {
+    "joy": ("happy", "excited", "success"),
+    "sadness": ("sad", "failed", "disappointed"),
+    "fear": ("worried", "afraid", "anxious"),
+    "anger": ("angry", "frustrated", "annoyed"),
+}
+
+def _build_emotion_automaton():
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for emotion, words in EMOTION_WORDS.items():
+        for word in words:
+            automaton.add_word(word, emotion)
+    automaton.make_automaton()
+    return automaton
+
+_EMOTION_AUTOMATON = _build_emotion_automaton()
+
+@lru_cache(maxsize=4096)
+def _emotion_weight(content: str) -> float:
+    """0.3 per emotion with a trigger word in the (lowercased) content, capped at 1.0"""
+    if _EMOTION_AUTOMATON is not None:
+        hits = len({emotion for _, emotion in _EMOTION_AUTOMATON.iter(content)})
+    else:
+        hits = sum(any(word in content for word in words) for words in EMOTION_WORDS.values())
+    return min(1.0, 0.3 * hits)
+
+@lru_cache(maxsize=1024)
+def _decode_tags(raw: str) -> tuple:
+    return tuple(_json_loads(raw))
 
 class MemoryType(Enum):
     EPISODIC = "episodic"
@@ -34,7 +211,7 @@ class MemoryType(Enum):
     PREDICTIVE = "predictive"
     COLLECTIVE = "collective"
 
-@dataclass
+@dataclass(slots=True)
 class MemoryEntry:
     id: str
     content: Any
@@ -43,7 +220,106 @@ class MemoryEntry:
     importance: float
     emotional_weight: float = 0.0
     tags: List[str] = field(default_factory=list)
+    # int8 components; multiply by embedding_scale to recover the float vector
     embedding: Optional[np.ndarray] = None
+    embedding_scale: float = 0.0
+
+    def set_embedding(self, vector: Any):
+        self.embedding, self.embedding_scale = quantize_embedding(vector)
+
+def quantize_embedding(vector: Any) -> Tuple[np.ndarray, float]:
+    """Symmetric int8 quantization with one scale per vector"""
+    v = np.asarray(vector, dtype=np.float32)
+    peak = float(np.max(np.abs(v))) if v.size else 0.0
+    if peak == 0.0:
+        return np.zeros(v.shape, dtype=np.int8), 0.0
+    scale = peak / 127
+    return np.round(v / scale).astype(np.int8), scale
+
+def rank_by_embedding(memories: List[MemoryEntry], vector: Any) -> List[MemoryEntry]:
+    """Memories by descending cosine similarity to vector, then those without a comparable embedding.
+
+    Similarities are computed on the int8 components with int32 accumulation; the scales cancel out.
+    """
+    query, _ = quantize_embedding(vector)
+    embedded = [m for m in memories if m.embedding is not None and m.embedding.shape == query.shape]
+    if not embedded:
+        return memories
+    matrix = np.stack([m.embedding for m in embedded]).astype(np.int32)
+    q = query.astype(np.int32)
+    dots = (matrix @ q).astype(np.float64)
+    norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix).astype(np.float64) * float(q @ q))
+    similarity = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+    ranked = [embedded[i] for i in np.argsort(-similarity, kind="stable")]
+    ranked_ids = {m.id for m in embedded}
+    return ranked + [m for m in memories if m.id not in ranked_ids]
+
+def _datetime_ns(dt: datetime) -> int:
+    """Epoch nanoseconds at microsecond resolution, so ordering matches datetime comparisons"""
+    return round(dt.timestamp() * 1e6) * 1000
+
+_MEMORY_TYPES = tuple(MemoryType)
+_MEMORY_TYPE_CODES = {memory_type: code for code, memory_type in enumerate(_MEMORY_TYPES)}
+
+class MemoryColumns:
+    """Struct-of-arrays mirror of the memory dict for vectorized query filtering"""
+
+    def __init__(self, capacity: int = 1024):
+        self.ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.importance = np.empty(capacity, dtype=np.float64)
+        self.memory_type = np.empty(capacity, dtype=np.int8)
+        self.timestamp = np.empty(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _grow(self):
+        capacity = max(2 * len(self.importance), 1)
+        for name in ("importance", "memory_type", "timestamp"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:len(self.ids)] = old[:len(self.ids)]
+            setattr(self, name, new)
+
+    def put(self, memory: MemoryEntry):
+        row = self.row_of.get(memory.id)
+        if row is None:
+            row = len(self.ids)
+            if row == len(self.importance):
+                self._grow()
+            self.ids.append(memory.id)
+            self.row_of[memory.id] = row
+        self.importance[row] = memory.importance
+        self.memory_type[row] = _MEMORY_TYPE_CODES[memory.memory_type]
+        self.timestamp[row] = _datetime_ns(memory.timestamp)
+
+    def compact(self, keep: np.ndarray):
+        """Drop the rows where keep is False, preserving order"""
+        n = len(self.ids)
+        kept = int(np.count_nonzero(keep))
+        for name in ("importance", "memory_type", "timestamp"):
+            column = getattr(self, name)
+            column[:kept] = column[:n][keep]
+        self.ids = [memory_id for memory_id, k in zip(self.ids, keep) if k]
+        self.row_of = {memory_id: row for row, memory_id in enumerate(self.ids)}
+
+    def oldest_ns(self) -> Optional[int]:
+        n = len(self.ids)
+        return int(self.timestamp[:n].min()) if n else None
+
+    def select(self, query: Dict[str, Any], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rows (all, or the given ascending candidates) matching type/min_importance, most important first"""
+        if rows is None:
+            rows = np.arange(len(self.ids))
+        if "type" in query:
+            code = _MEMORY_TYPE_CODES.get(query["type"])
+            if code is None:
+                return np.empty(0, dtype=np.intp)
+            rows = rows[self.memory_type[rows] == code]
+        if "min_importance" in query:
+            rows = rows[self.importance[rows] >= query["min_importance"]]
+        return rows[np.argsort(-self.importance[rows], kind="stable")]
 
 class MemoryManagementSystem:
     """Advanced memory system with multiple memory types"""
@@ -52,15 +328,30 @@ class MemoryManagementSystem:
         self.system = system
         self.logger = logging.getLogger("MemorySystem")
         self.memories: Dict[str, MemoryEntry] = {}
-        self.episodic_buffer: List[MemoryEntry] = []
+        # Same entries partitioned per type, so per-type work never touches other types
+        self.memories_by_type: Dict[MemoryType, Dict[str, MemoryEntry]] = {}
+        self.episodic_buffer: Deque[MemoryEntry] = deque(maxlen=EPISODIC_BUFFER_SIZE)
         self.semantic_network: Dict[str, List[str]] = {}
         self.short_term_window: List[MemoryEntry] = []
         self.long_term_storage: List[MemoryEntry] = []
-
-        # Database for persistence
-        self.db_connection = None
+        self._columns = MemoryColumns()
+        # Inverted index: memory ids per tag
+        self._by_tag: Dict[str, Set[str]] = {}
+
+        # Automatic defragmentation bookkeeping
+        self._ops_since_defrag = 0
+        self._expired_candidates = 0
+        self._defrag_task: Optional[asyncio.Task] = None
+
+        # Database for persistence; consolidated memories are written by _writer_loop
+        self.db_pool: Optional[SQLitePool] = None
+        self._write_queue: asyncio.Queue = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
         self.db_path = "data/memory.db"
 
+        # Oldest memory timestamp (epoch ns), kept current on store and delete
+        self._oldest_ns: Optional[int] = None
+
     async def initialize(self):
         """Initialize memory system"""
         self.logger.info("🧠 Initializing Enhanced Memory System...")
@@ -68,60 +359,27 @@ class MemoryManagementSystem:
 
         await self._setup_database()
         await self._load_memories()
+        self._writer_task = asyncio.create_task(self._writer_loop())
 
         self.logger.info("✅ Memory system initialized")
 
     async def _setup_database(self):
         """Setup SQLite database for memory persistence"""
-        self.db_connection = sqlite3.connect(self.db_path, check_same_thread=False)
-        cursor = self.db_connection.cursor()
-
-        cursor.execute('''
-CREATE TABLE IF NOT EXISTS memories (
-    id TEXT PRIMARY KEY,
-    content TEXT,
-    memory_type TEXT,
-    timestamp TEXT,
-    importance REAL,
-    emotional_weight REAL,
-    tags TEXT
-)
-''')
-
-        cursor.execute('''
-CREATE TABLE IF NOT EXISTS associations (
-    source_id TEXT,
-    target_id TEXT,
-    strength REAL,
-    timestamp TEXT,
-    PRIMARY KEY (source_id, target_id)
-)
-''')
-
-        self.db_connection.commit()
+        self.db_pool = SQLitePool(self.db_path, self.system.config.memory.db_pool_size)
+        await self.db_pool.run(_create_schema)
 
     async def _load_memories(self):
         """Load memories from database"""
-        if not self.db_connection:
+        if not self.db_pool:
             return
 
-        cursor = self.db_connection.cursor()
-        cursor.execute("SELECT * FROM memories")
-
-        for row in cursor.fetchall():
-            memory = MemoryEntry(
-                id=row[0],
-                content=json.loads(row[1]),
-                memory_type=MemoryType(row[2]),
-                timestamp=datetime.fromisoformat(row[3]),
-                importance=row[4],
-                emotional_weight=row[5],
-                tags=json.loads(row[6])
-            )
+        for memory in await self.db_pool.run(_select_memories):
             self.memories[memory.id] = memory
+            self._columns.put(memory)
+            self._index(memory)
 
-    async def store_episodic_memory(self, event: Dict[str, Any]) -> str:
-        """Store episodic memory (Feature 51: Biological Memory)"""
+    async def store_episodic_memory(self, event: Dict[str, Any], embedding: Optional[Any] = None) -> str:
+        """Store episodic memory (Feature 51: Biological Memory); embedding is kept int8-quantized"""
         memory_id = f"episodic_{uuid.uuid4().hex[:8]}"
 
         # Calculate emotional weight
@@ -136,126 +394,169 @@ CREATE TABLE IF NOT EXISTS associations (
             emotional_weight=emotional_weight,
             tags=event.get("tags", [])
         )
+        if embedding is not None:
+            memory.set_embedding(embedding)
 
         self.memories[memory_id] = memory
+        self._columns.put(memory)
+        self._index(memory)
         self.episodic_buffer.append(memory)
+        self._note_store(memory)
 
-        # Consolidate if buffer is full
-        if len(self.episodic_buffer) > 100:
+        # Consolidate once the buffer is full, before the next append would evict its oldest entry
+        if len(self.episodic_buffer) == self.episodic_buffer.maxlen:
             await self._consolidate_memories()
 
         return memory_id
 
+    def _note_store(self, memory: MemoryEntry):
+        """Count stores since the last defrag and schedule one when either threshold is crossed"""
+        self._ops_since_defrag += 1
+        if memory.importance < 0.3:
+            self._expired_candidates += 1
+
+        config = self.system.config.memory.defragmentation
+        candidate_limit = max(config.min_candidates, config.candidate_fraction * len(self.memories))
+        if self._ops_since_defrag < config.every_ops and self._expired_candidates <= candidate_limit:
+            return
+        if not (self.system.config.feature_flags & FeatureFlag.MEMORY_DEFRAGMENTATION):
+            return
+        if self._defrag_task is None or self._defrag_task.done():
+            self._defrag_task = asyncio.create_task(self.defragment_memory())
+
     def _calculate_emotional_weight(self, event: Dict) -> float:
         """Calculate emotional weight for memory (Feature 26)"""
-        if not self.system.config.feature_flags.get("conscious_memory"):
+        if not (self.system.config.feature_flags & FeatureFlag.CONSCIOUS_MEMORY):
             return 0.0
 
-        # Simple emotional calculus
-        content = str(event.get("content", "")).lower()
-        emotion_words = {
-            "joy": ["happy", "excited", "success"],
-            "sadness": ["sad", "failed", "disappointed"],
-            "fear": ["worried", "afraid", "anxious"],
-            "anger": ["angry", "frustrated", "annoyed"]
-        }
-
-        weight = 0.0
-        for emotion, words in emotion_words.items():
-            if any(word in content for word in words):
-                weight += 0.3
+        # Only structured content needs rendering to a string
+        content = event.get("content", "")
+        text = content if isinstance(content, str) else str(content)
 
-        return min(1.0, weight)
+        # Simple emotional calculus, cached per distinct content
+        return _emotion_weight(text.lower())
 
     async def _consolidate_memories(self):
         """Consolidate memories from short-term to long-term (Feature 51)"""
         self.logger.info("🔄 Consolidating memories...")
 
-        # Sort by importance and emotional weight
-        self.episodic_buffer.sort(key=lambda m: m.importance + m.emotional_weight, reverse=True)
-
-        # Transfer top memories to long-term
-        for memory in self.episodic_buffer[:20]:
-            self.long_term_storage.append(memory)
-            await self._store_in_database(memory)
+        # Oldest first: popleft keeps each consolidation O(batch) with no buffer rebuild
+        buffer = self.episodic_buffer
+        batch = [buffer.popleft() for _ in range(min(CONSOLIDATION_BATCH, len(buffer)))]
 
-        # Clear buffer
-        self.episodic_buffer = self.episodic_buffer[20:]
+        # Transfer to long-term; the background writer persists them
+        self.long_term_storage.extend(batch)
+        if self._writer_task is None:
+            await self._store_many_in_database(batch)
+        else:
+            for memory in batch:
+                self._write_queue.put_nowait(memory)
 
         self.logger.info(f"✅ Consolidated {len(self.long_term_storage)} long-term memories")
 
     async def _store_in_database(self, memory: MemoryEntry):
         """Store memory in database"""
-        if not self.db_connection:
+        await self._store_many_in_database([memory])
+
+    async def _store_many_in_database(self, memories: List[MemoryEntry]):
+        """Store memories in database with a single commit"""
+        if not self.db_pool or not memories:
             return
 
-        cursor = self.db_connection.cursor()
-        cursor.execute('''
-INSERT OR REPLACE INTO memories
-(id, content, memory_type, timestamp, importance, emotional_weight, tags)
-VALUES (?, ?, ?, ?, ?, ?, ?)
-''', (
-            memory.id,
-            json.dumps(memory.content),
-            memory.memory_type.value,
-            memory.timestamp.isoformat(),
-            memory.importance,
-            memory.emotional_weight,
-            json.dumps(memory.tags)
-        ))
-
-        self.db_connection.commit()
+        await self.db_pool.run(_insert_memories, list(memories))
+
+    async def _writer_loop(self):
+        """Drain queued memories and commit them in batches of up to WRITE_BATCH_MAX"""
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < WRITE_BATCH_MAX:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self._store_many_in_database(batch)
+            except Exception as e:
+                self.logger.error(f"❌ Failed to persist {len(batch)} memories: {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    async def shutdown(self):
+        """Flush pending writes and close pooled database connections"""
+        if self._writer_task:
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            self._writer_task = None
+        if self.db_pool:
+            await self.db_pool.close()
+            self.db_pool = None
 
     async def retrieve_memory(self, query: Dict[str, Any]) -> List[MemoryEntry]:
-        """Retrieve memories based on query"""
-        results = []
-
-        for memory in self.memories.values():
-            if self._matches_query(memory, query):
-                results.append(memory)
-
-        # Sort by relevance
-        results.sort(key=lambda m: m.importance, reverse=True)
-
+        """Retrieve memories based on query; an "embedding" vector orders results by similarity"""
+        # Indexes narrow the candidates; numeric filters and relevance order come from the column arrays
+        rows = None
+        candidates = self._indexed_candidates(query)
+        if candidates is not None:
+            row_of = self._columns.row_of
+            rows = np.sort(np.fromiter((row_of[i] for i in candidates), dtype=np.intp, count=len(candidates)))
+
+        ids = self._columns.ids
+        results = [self.memories[ids[row]] for row in self._columns.select(query, rows)]
+        if query.get("embedding") is not None:
+            results = rank_by_embedding(results, query["embedding"])
         return results
 
-    def _matches_query(self, memory: MemoryEntry, query: Dict) -> bool:
-        """Check if memory matches query"""
-        if "type" in query and memory.memory_type != query["type"]:
-            return False
-
+    def _indexed_candidates(self, query: Dict[str, Any]) -> Optional[Set[str]]:
+        """Ids satisfying the type/tags filters, or None when the query has neither"""
+        candidates = None
         if "tags" in query:
-            if not any(tag in memory.tags for tag in query["tags"]):
-                return False
-
-        if "min_importance" in query:
-            if memory.importance < query["min_importance"]:
-                return False
-
-        return True
+            candidates = set().union(*(self._by_tag.get(tag, ()) for tag in query["tags"]))
+        if "type" in query:
+            by_type = self.memories_by_type.get(query["type"], {})
+            candidates = set(by_type) if candidates is None else candidates & by_type.keys()
+        return candidates
+
+    def _index(self, memory: MemoryEntry):
+        ts_ns = _datetime_ns(memory.timestamp)
+        if self._oldest_ns is None or ts_ns < self._oldest_ns:
+            self._oldest_ns = ts_ns
+        self.memories_by_type.setdefault(memory.memory_type, {})[memory.id] = memory
+        for tag in memory.tags:
+            self._by_tag.setdefault(tag, set()).add(memory.id)
+
+    def _unindex(self, memory: MemoryEntry):
+        self.memories_by_type.get(memory.memory_type, {}).pop(memory.id, None)
+        for tag in memory.tags:
+            self._by_tag.get(tag, set()).discard(memory.id)
 
     async def defragment_memory(self) -> Dict[str, Any]:
         """Defragment memory storage (Feature 4)"""
-        if not self.system.config.feature_flags.get("memory_defragmentation"):
+        if not (self.system.config.feature_flags & FeatureFlag.MEMORY_DEFRAGMENTATION):
             return {"status": "disabled"}
 
         self.logger.info("🔧 Defragmenting memory...")
+        self._ops_since_defrag = 0
+        self._expired_candidates = 0
 
         # Remove expired memories
         cutoff_time = datetime.now() - timedelta(
             seconds=self.system.config.memory.defragmentation.cleanup_expired_threshold
         )
 
-        removed_count = 0
-        for memory_id in list(self.memories.keys()):
-            memory = self.memories[memory_id]
-            if memory.timestamp < cutoff_time and memory.importance < 0.3:
-                del self.memories[memory_id]
-                removed_count += 1
+        # One vectorized pass over the timestamp/importance columns
+        columns = self._columns
+        n = len(columns)
+        expired = (columns.timestamp[:n] < _datetime_ns(cutoff_time)) & (columns.importance[:n] < 0.3)
+
+        expired_rows = np.flatnonzero(expired)
+        for row in expired_rows:
+            self._unindex(self.memories.pop(columns.ids[row]))
+        removed_count = len(expired_rows)
 
-        # Reorganize remaining memories
-        sorted_memories = sorted(self.memories.values(), key=lambda m: m.importance, reverse=True)
-        self.memories = {m.id: m for m in sorted_memories}
+        if removed_count:
+            columns.compact(~expired)
+            self._oldest_ns = columns.oldest_ns()
 
         self.logger.info(f"✅ Defragmented: removed {removed_count} memories")
 
@@ -266,7 +567,7 @@ VALUES (?, ?, ?, ?, ?, ?, ?)
 
     async def store_collective_memory(self, shared_experience: Dict):
         """Store shared memory across agents (Feature 65)"""
-        if not self.system.config.feature_flags.get("collective_memory"):
+        if not (self.system.config.feature_flags & FeatureFlag.COLLECTIVE_MEMORY):
             return
 
         # Add consensus tags
@@ -279,7 +580,7 @@ VALUES (?, ?, ?, ?, ?, ?, ?)
 
     async def consolidate_during_sleep(self):
         """Consolidate memories during sleep (Feature 61: Dream Memory)"""
-        if not self.system.config.feature_flags.get("dream_memory"):
+        if not (self.system.config.feature_flags & FeatureFlag.DREAM_MEMORY):
             return
 
         self.logger.info("💭 Consolidating memories during sleep...")
@@ -298,9 +599,9 @@ VALUES (?, ?, ?, ?, ?, ?, ?)
         if len(self.memories) < 10:
             return
 
-        # Select random memories
-        import random
-        sample = random.sample(list(self.memories.values()), min(5, len(self.memories)))
+        # Select random memories; sample ids from the column id list rather than copying all values
+        ids = self._columns.ids
+        sample = [self.memories[memory_id] for memory_id in random.sample(ids, min(5, len(ids)))]
 
         # Generate novel combination
         combined_content = " + ".join([str(m.content) for m in sample])
@@ -316,11 +617,13 @@ VALUES (?, ?, ?, ?, ?, ?, ?)
 
     def get_memory_statistics(self) -> Dict[str, Any]:
         """Get memory statistics"""
+        # Everything here is maintained incrementally; no scan over memories
+        oldest = self._oldest_ns
         return {
             "total_memories": len(self.memories),
-            "episodic_memories": len([m for m in self.memories.values() if m.memory_type == MemoryType.EPISODIC]),
-            "semantic_memories": len([m for m in self.memories.values() if m.memory_type == MemoryType.SEMANTIC]),
+            "episodic_memories": len(self.memories_by_type.get(MemoryType.EPISODIC, ())),
+            "semantic_memories": len(self.memories_by_type.get(MemoryType.SEMANTIC, ())),
             "buffer_size": len(self.episodic_buffer),
             "long_term_size": len(self.long_term_storage),
-            "temporal_depth": (datetime.now() - min([m.timestamp for m in self.memories.values()])).total_seconds() if self.memories else 0
+            "temporal_depth": (time.time_ns() - oldest) / 1e9 if oldest is not None else 0
         }
@@ -13,6 +13,8 @@ from typing import Dict, List, Any, Optional
 import plotly.graph_objects as go
 import plotly.express as px
 from collections import deque
+from src.config import FeatureFlag
+from src.consciousness_layer import ts_to_iso
 
 class AdvancedMonitoringSystem:
     """Comprehensive system monitoring"""
@@ -32,7 +34,7 @@ class AdvancedMonitoringSystem:
         # Start monitoring loops
         asyncio.create_task(self._continuous_metrics_collection())
 
-        if self.system.config.feature_flags.get("monitoring_dashboard_3d"):
+        if self.system.config.feature_flags & FeatureFlag.MONITORING_DASHBOARD_3D:
             await self._setup_3d_dashboard()
 
     async def _setup_3d_dashboard(self):
@@ -49,13 +51,16 @@ class AdvancedMonitoringSystem:
         """Collect metrics continuously"""
         while not self.system.shutdown_requested:
             try:
+                cpu, mem = self.system.sys_sample
+                disk_io = psutil.disk_io_counters()
+                network_io = psutil.net_io_counters()
                 metrics = {
                     "timestamp": datetime.now().isoformat(),
-                    "cpu_percent": psutil.cpu_percent(),
-                    "memory_percent": psutil.virtual_memory().percent,
-                    "disk_io": psutil.disk_io_counters()._asdict() if psutil.disk_io_counters() else {},
-                    "network_io": psutil.net_io_counters()._asdict() if psutil.net_io_counters() else {},
-                    "consciousness_level": self.system.consciousness_layer.current_state.level.value,
+                    "cpu_percent": cpu,
+                    "memory_percent": mem,
+                    "disk_io": disk_io._asdict() if disk_io else {},
+                    "network_io": network_io._asdict() if network_io else {},
+                    "consciousness_level": self.system.consciousness_layer.current_state.level_str,
                     "awareness_score": self.system.consciousness_layer.current_state.awareness_score,
                     "coherence_score": self.system.consciousness_layer.current_state.coherence_score,
                     "active_agents": len([a for a in self.system.agents if a.state == "active"]),
@@ -112,8 +117,9 @@ class AdvancedMonitoringSystem:
     async def track_energy_usage(self) -> float:
         """Track cognitive energy cost (Feature 90)"""
         # Estimate energy based on CPU usage
-        cpu_energy = psutil.cpu_percent() * 0.5 # watts
-        memory_energy = psutil.virtual_memory().percent * 0.2 # watts
+        cpu, mem = self.system.sys_sample
+        cpu_energy = cpu * 0.5 # watts
+        memory_energy = mem * 0.2 # watts
         total_energy = cpu_energy + memory_energy
 
         self.energy_history.append({
@@ -150,8 +156,8 @@ class AdvancedMonitoringSystem:
         if len(self.system.decision_log) < 10:
             return 0.5
 
-        recent = self.system.decision_log[-10:]
-        avg_confidence = np.mean([d.get("final_decision", {}).get("confidence", 0.5) for d in recent])
+        recent = self.system.recent_decisions(10)
+        avg_confidence = np.mean([d["parsed"].confidence for d in recent])
 
         # Check consistency
         consistency = self._check_consistency(recent)
@@ -163,7 +169,7 @@ class AdvancedMonitoringSystem:
         if len(decisions) < 2:
             return 1.0
 
-        conclusions = [d.get("final_decision", {}).get("conclusion", "") for d in decisions]
+        conclusions = [d["parsed"].conclusion for d in decisions]
         unique_conclusions = len(set(conclusions))
 
         return 1.0 - (unique_conclusions - 1) / len(conclusions)
@@ -178,7 +184,7 @@ class AdvancedMonitoringSystem:
             flow.append({
                 "level": state["state"]["level"],
                 "awareness": state["state"]["awareness_score"],
-                "timestamp": state["timestamp"]
+                "timestamp": ts_to_iso(state["ts_ns"])
             })
 
         return {"flow": flow}
@@ -212,13 +218,13 @@ class AdvancedMonitoringSystem:
         report = {
             "generated_at": datetime.now().isoformat(),
             "system_metrics": {
-                "total_tasks": len(self.system.decision_log),
-                "learning_cycles": len([m for m in self.system.metrics if m.state.value == "learning"]),
-                "evolution_cycles": len([m for m in self.system.metrics if m.state.value == "evolving"]),
-                "average_awareness": np.mean([m.awareness_score for m in self.system.metrics]) if self.system.metrics else 0
+                "total_tasks": self.system.processed_task_count,
+                "learning_cycles": self.system.metrics.count_state("learning"),
+                "evolution_cycles": self.system.metrics.count_state("evolving"),
+                "average_awareness": float(self.system.metrics.column("awareness_score").mean()) if len(self.system.metrics) else 0
             },
             "feature_usage": self.system.feature_usage_stats,
-            "consciousness_trend": [m.awareness_score for m in self.system.metrics[-100:]]
+            "consciousness_trend": self.system.metrics.column("awareness_score", 100).tolist()
         }
 
         return report
@@ -11,6 +11,8 @@ import secrets
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from cryptography.fernet import Fernet
+from src.config import FeatureFlag
+from src.serialization import dumps
 
 class EncryptionManager:
     """Feature 96: Encrypted memory storage"""
@@ -22,8 +24,7 @@ class EncryptionManager:
 
     def encrypt(self, data: Dict[str, Any]) -> bytes:
         """Encrypt dictionary data"""
-        serialized = json.dumps(data, default=str).encode()
-        return self.cipher.encrypt(serialized)
+        return self.cipher.encrypt(dumps(data))
 
     def decrypt(self, encrypted_data: bytes) -> Dict[str, Any]:
         """Decrypt to dictionary"""
@@ -81,7 +82,7 @@ class SmartSecuritySystem:
         self.logger.info("🔒 Initializing Smart Security System...")
 
         # Start self-audit loop
-        if self.system.config.feature_flags.get("self_security_audit"):
+        if self.system.config.feature_flags & FeatureFlag.SELF_SECURITY_AUDIT:
             asyncio.create_task(self._self_audit_loop())
 
     async def _self_audit_loop(self):
@@ -97,7 +98,7 @@ class SmartSecuritySystem:
                     await self._auto_repair(vulnerabilities)
 
                 # Ethical review (Feature 98)
-                await self.ethical_review(self.system.decision_log[-50:])
+                await self.ethical_review(self.system.recent_decisions(50))
 
                 await asyncio.sleep(3600) # Hourly audits
 
@@ -136,11 +137,11 @@ class SmartSecuritySystem:
 
     async def ethical_review(self, decisions: List[Dict]):
         """Ethical review of decisions (Feature 98)"""
-        if not self.system.config.feature_flags.get("ethical_decision_analysis"):
+        if not (self.system.config.feature_flags & FeatureFlag.ETHICAL_DECISION_ANALYSIS):
             return
 
         for decision in decisions:
-            conclusion = decision.get("final_decision", {}).get("conclusion", "").lower()
+            conclusion = decision["parsed"].conclusion.lower()
 
             unethical_keywords = ["harm", "damage", "exploit", "manipulate", "deceive"]
 
@@ -159,7 +160,7 @@ class SmartSecuritySystem:
 
     async def backup_critical_data(self):
         """Intelligent backup (Feature 100)"""
-        if not self.system.config.feature_flags.get("conscious_backup_system"):
+        if not (self.system.config.feature_flags & FeatureFlag.CONSCIOUS_BACKUP_SYSTEM):
             return
 
         self.logger.info("💾 Backing up critical data...")
@@ -0,0 +1,17 @@
+"""
+Shared JSON serialization helpers
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+def dumps(obj: Any) -> bytes:
+    """Serialize state/event payloads to JSON bytes, via orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=str).encode()
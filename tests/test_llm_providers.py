@@ -0,0 +1,63 @@
+"""
+LLM provider manager tests
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for _sdk in ("openai", "anthropic", "google.generativeai", "huggingface_hub", "ollama"):
+    pytest.importorskip(_sdk)
+
+from src import llm_providers
+from src.config import SystemConfig
+from src.llm_providers import LLMProviderManager, RateLimiter
+
+class BlockingProvider:
+    """Holds generate() for the "works" prompt open until released, so other calls can run meanwhile"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        if prompt == "works":
+            self.started.set()
+            await self.release.wait()
+        return f"answer to {prompt}"
+
+class FlakyEmbeddings:
+    def embed_query(self, text: str):
+        if text == "fails":
+            raise RuntimeError("embedding backend down")
+        return [1.0, 0.0, 0.0]
+
+def test_semantic_cache_disabled_during_inflight_generate(monkeypatch):
+    """An embedding failure in one call must not break a call already waiting on its provider"""
+    async def fake_get_embeddings(model_name):
+        return FlakyEmbeddings()
+
+    monkeypatch.setattr(llm_providers, "get_embeddings", fake_get_embeddings)
+
+    async def scenario():
+        config = SystemConfig().advanced_features
+        config.llm_providers.semantic_cache_enabled = True
+        manager = LLMProviderManager(config)
+        provider = BlockingProvider()
+        manager.providers = {"openai": provider}
+        manager.rate_limiters = {"openai": RateLimiter(0, 4)}
+        manager.active_provider = "openai"
+
+        inflight = asyncio.create_task(manager.generate("works"))
+        await provider.started.wait()
+
+        assert await manager.generate("fails") == "answer to fails"
+        assert manager.semantic_cache is None
+
+        provider.release.set()
+        assert await inflight == "answer to works"
+
+    asyncio.run(scenario())